@@ -0,0 +1,43 @@
+"""Add composite indexes for per-owner project, application, rating and task lookups
+
+Revision ID: add_access_pattern_indexes
+Revises: tech_stack_to_jsonb
+Create Date: 2025-02-01 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_access_pattern_indexes'
+down_revision = 'tech_stack_to_jsonb'
+branch_labels = None
+depends_on = None
+
+
+# Фильтр + сортировка по created_at одним индексом: PostgreSQL читает его
+# в обратном порядке для ORDER BY ... DESC и обходится без сортировки
+ACCESS_PATTERN_INDEXES = [
+    ('ix_projects_customer_created_at', 'projects', ['customer_id', 'created_at']),
+    ('ix_applications_project_created_at', 'applications', ['project_id', 'created_at']),
+    ('ix_applications_student_created_at', 'applications', ['student_id', 'created_at']),
+    ('ix_ratings_reviewee_created_at', 'ratings', ['reviewee_id', 'created_at']),
+    ('ix_tasks_project_order', 'tasks', ['project_id', 'order']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in ACCESS_PATTERN_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(ACCESS_PATTERN_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,67 @@
+"""Add materialized view with admin statistics
+
+Revision ID: add_admin_stats_mv
+Revises: add_list_indexes
+Create Date: 2025-01-27 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_admin_stats_mv'
+down_revision = 'add_list_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Одна строка: по агрегату на таблицу. Колонка id нужна для уникального индекса,
+# без него REFRESH MATERIALIZED VIEW CONCURRENTLY не работает
+STATS_VIEW_SQL = """
+CREATE MATERIALIZED VIEW IF NOT EXISTS admin_stats_mv AS
+SELECT 1 AS id, u.*, p.*, a.*, c.*
+FROM (
+    SELECT
+        count(*) AS total_users,
+        count(*) FILTER (WHERE role = 'STUDENT') AS total_students,
+        count(*) FILTER (WHERE role = 'CUSTOMER') AS total_customers,
+        count(*) FILTER (WHERE role = 'ADMIN') AS total_admins
+    FROM users
+) u
+CROSS JOIN (
+    SELECT
+        count(*) AS total_projects,
+        count(*) FILTER (WHERE status = 'OPEN') AS open_projects,
+        count(*) FILTER (WHERE status = 'IN_PROGRESS') AS in_progress_projects,
+        count(*) FILTER (WHERE status = 'COMPLETED') AS completed_projects
+    FROM projects
+) p
+CROSS JOIN (
+    SELECT
+        count(*) AS total_applications,
+        count(*) FILTER (WHERE status = 'PENDING') AS pending_applications
+    FROM applications
+) a
+CROSS JOIN (
+    SELECT
+        count(*) AS total_contracts,
+        count(*) FILTER (WHERE status = 'ACTIVE') AS active_contracts
+    FROM contracts
+) c
+"""
+
+
+def upgrade() -> None:
+    # Материализованные представления есть только в PostgreSQL
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(STATS_VIEW_SQL)
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_admin_stats_mv_id ON admin_stats_mv (id)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS admin_stats_mv")
@@ -0,0 +1,42 @@
+"""Add indexes on foreign key columns
+
+Revision ID: add_fk_indexes
+Revises: add_assignee_to_projects
+Create Date: 2025-01-20 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_fk_indexes'
+down_revision = 'add_assignee_to_projects'
+branch_labels = None
+depends_on = None
+
+
+# (таблица, колонка) — внешние ключи, по которым фильтруют API и админка.
+# Остальные ключи ведут составные индексы из add_my_projects_indexes,
+# add_access_pattern_indexes и add_unique_application_rating
+FK_COLUMNS = [
+    ('tasks', 'assignee_id'),
+    ('contracts', 'project_id'),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY нельзя выполнять внутри транзакции
+    with op.get_context().autocommit_block():
+        for table, column in FK_COLUMNS:
+            op.create_index(
+                f'ix_{table}_{column}',
+                table,
+                [column],
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for table, column in reversed(FK_COLUMNS):
+        op.drop_index(f'ix_{table}_{column}', table_name=table, if_exists=True)
@@ -0,0 +1,42 @@
+"""Add composite indexes for list filters and sorting
+
+Revision ID: add_list_indexes
+Revises: add_trgm_search_indexes
+Create Date: 2025-01-25 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_list_indexes'
+down_revision = 'add_trgm_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Фильтр по колонке + ORDER BY created_at, id (в обе стороны — обратным сканом)
+LIST_INDEXES = [
+    ('ix_users_role_created_at', 'users', ['role', 'created_at', 'id']),
+    ('ix_users_is_active_created_at', 'users', ['is_active', 'created_at', 'id']),
+    ('ix_projects_status_created_at', 'projects', ['status', 'created_at', 'id']),
+    ('ix_applications_status_created_at', 'applications', ['status', 'created_at', 'id']),
+    ('ix_contracts_status_created_at', 'contracts', ['status', 'created_at', 'id']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in LIST_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(LIST_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,60 @@
+"""Add llm_estimation and assignee_id fields to projects
+
+Revision ID: add_assignee_to_projects
+Revises: add_llm_estimation
+Create Date: 2025-01-15 00:00:00.000000
+
+Включает изменения прежней ревизии add_llm_estimation (теперь пустой):
+все изменения таблицы projects выполняются одной группой DDL.
+Базы, где add_llm_estimation уже применена, llm_estimation имеют —
+колонка добавляется, только если её нет.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_assignee_to_projects'
+down_revision = 'add_llm_estimation'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    is_postgres = bind.dialect.name == "postgresql"
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('projects')}
+
+    with op.batch_alter_table('projects') as batch_op:
+        # Оценка времени выполнения от LLM
+        if 'llm_estimation' not in columns:
+            batch_op.add_column(sa.Column('llm_estimation', sa.Text(), nullable=True))
+        # Исполнитель проекта
+        batch_op.add_column(sa.Column('assignee_id', sa.Integer(), nullable=True))
+        if not is_postgres:
+            batch_op.create_foreign_key(
+                'fk_projects_assignee_id_users',
+                'users',
+                ['assignee_id'],
+                ['id']
+            )
+
+    if is_postgres:
+        # Внешний ключ без проверки существующих строк — короткая блокировка
+        op.execute(
+            "ALTER TABLE projects ADD CONSTRAINT fk_projects_assignee_id_users "
+            "FOREIGN KEY (assignee_id) REFERENCES users (id) NOT VALID"
+        )
+        # Проверка строк — вне транзакции, без ACCESS EXCLUSIVE
+        with op.get_context().autocommit_block():
+            op.execute(
+                "ALTER TABLE projects VALIDATE CONSTRAINT fk_projects_assignee_id_users"
+            )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('projects') as batch_op:
+        batch_op.drop_constraint('fk_projects_assignee_id_users', type_='foreignkey')
+        batch_op.drop_column('assignee_id')
+        batch_op.drop_column('llm_estimation')
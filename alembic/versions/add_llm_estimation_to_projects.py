@@ -4,9 +4,10 @@ Revision ID: add_llm_estimation
 Revises: 
 Create Date: 2025-12-05 00:00:00.000000
 
+Колонка теперь добавляется в add_assignee_to_projects вместе с assignee_id.
+Ревизия оставлена пустой, чтобы базы, отмеченные на ней, находили свою ревизию.
+
 """
-from alembic import op
-import sqlalchemy as sa
 
 
 # revision identifiers, used by Alembic.
@@ -17,11 +18,8 @@ depends_on = None
 
 
 def upgrade() -> None:
-    # Добавляем поле llm_estimation в таблицу projects
-    op.add_column('projects', sa.Column('llm_estimation', sa.Text(), nullable=True))
+    pass
 
 
 def downgrade() -> None:
-    # Удаляем поле llm_estimation из таблицы projects
-    op.drop_column('projects', 'llm_estimation')
-
+    pass
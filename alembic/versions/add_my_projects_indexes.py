@@ -0,0 +1,39 @@
+"""Add indexes for the student "my projects" lookup
+
+Revision ID: add_my_projects_indexes
+Revises: add_admin_stats_mv
+Create Date: 2025-01-28 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_my_projects_indexes'
+down_revision = 'add_admin_stats_mv'
+branch_labels = None
+depends_on = None
+
+
+# Обе ветки UNION ALL в /projects/my читаются только по индексу
+MY_PROJECTS_INDEXES = [
+    ('ix_projects_assignee_created_at', 'projects', ['assignee_id', 'created_at']),
+    ('ix_applications_student_project', 'applications', ['student_id', 'project_id']),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in MY_PROJECTS_INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(MY_PROJECTS_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
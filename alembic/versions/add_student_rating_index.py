@@ -0,0 +1,33 @@
+"""Add partial index for student lists ordered by rating
+
+Revision ID: add_student_rating_index
+Revises: add_access_pattern_indexes
+Create Date: 2025-02-02 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_student_rating_index'
+down_revision = 'add_access_pattern_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # /users и /users/leaderboard: активные студенты по убыванию рейтинга
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_student_rating',
+            'users',
+            [sa.text('rating_score DESC')],
+            if_not_exists=True,
+            postgresql_concurrently=True,
+            postgresql_where=sa.text("role = 'STUDENT' AND is_active = true"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_student_rating', table_name='users', if_exists=True)
@@ -0,0 +1,48 @@
+"""Add trigram indexes for ILIKE search
+
+Revision ID: add_trgm_search_indexes
+Revises: add_fk_indexes
+Create Date: 2025-01-22 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_trgm_search_indexes'
+down_revision = 'add_fk_indexes'
+branch_labels = None
+depends_on = None
+
+
+# (таблица, колонка) — поля поиска ILIKE '%...%' в админке и admin API
+SEARCH_COLUMNS = [
+    ('users', 'email'),
+    ('users', 'first_name'),
+    ('users', 'last_name'),
+    ('projects', 'title'),
+    ('projects', 'description'),
+]
+
+
+def upgrade() -> None:
+    # pg_trgm есть только в PostgreSQL
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    with op.get_context().autocommit_block():
+        for table, column in SEARCH_COLUMNS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{table}_{column}_trgm "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table, column in reversed(SEARCH_COLUMNS):
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_trgm")
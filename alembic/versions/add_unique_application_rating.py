@@ -0,0 +1,91 @@
+"""Add unique indexes for applications and ratings per project
+
+Revision ID: add_unique_application_rating
+Revises: add_my_projects_indexes
+Create Date: 2025-01-29 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_unique_application_rating'
+down_revision = 'add_my_projects_indexes'
+branch_labels = None
+depends_on = None
+
+
+# Цели ON CONFLICT в apply_for_project и create_rating
+UNIQUE_INDEXES = [
+    ('ux_applications_project_student', 'applications', ['project_id', 'student_id']),
+    ('ux_ratings_project_reviewer', 'ratings', ['project_id', 'reviewer_id']),
+]
+
+# Какую из повторных записей оставить: у заявок — принятую (по ней назначен
+# исполнитель), при равенстве — самую раннюю; у отзывов — самый ранний
+KEEP_ORDER = {
+    'applications': "(status = 'ACCEPTED') DESC, id",
+    'ratings': "id",
+}
+
+
+def upgrade() -> None:
+    is_postgres = op.get_bind().dialect.name == "postgresql"
+
+    # Прежний код проверял дубликат отдельным SELECT перед INSERT, так что повторы
+    # могли попасть в базу. С ними уникальный индекс не построится: из каждой группы
+    # повторов остаётся одна запись по KEEP_ORDER, остальные удаляются
+    for _, table, columns in UNIQUE_INDEXES:
+        key = ", ".join(columns)
+        op.execute(
+            f"""
+            DELETE FROM {table} WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY {key} ORDER BY {KEEP_ORDER[table]}) AS rn
+                    FROM {table}
+                ) ranked
+                WHERE rn > 1
+            )
+            """
+        )
+    # Средняя оценка получателей пересчитывается без удалённых повторных отзывов
+    op.execute(
+        """
+        UPDATE users SET rating_score = (
+            SELECT AVG(score) FROM ratings WHERE ratings.reviewee_id = users.id
+        )
+        WHERE id IN (SELECT reviewee_id FROM ratings)
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in UNIQUE_INDEXES:
+            if is_postgres:
+                # Прерванная сборка CONCURRENTLY оставляет невалидный индекс,
+                # и IF NOT EXISTS при повторном запуске его бы пропустил
+                op.execute(
+                    f"""
+                    DO $$
+                    BEGIN
+                        IF EXISTS (
+                            SELECT 1 FROM pg_index
+                            WHERE indexrelid = to_regclass('{name}') AND NOT indisvalid
+                        ) THEN
+                            DROP INDEX {name};
+                        END IF;
+                    END $$
+                    """
+                )
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=True,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(UNIQUE_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,37 @@
+"""Add rating sum and count to users
+
+Revision ID: add_user_rating_totals
+Revises: add_unique_application_rating
+Create Date: 2025-01-30 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_rating_totals'
+down_revision = 'add_unique_application_rating'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.add_column(sa.Column('rating_sum', sa.BigInteger(), nullable=False, server_default='0'))
+        batch_op.add_column(sa.Column('rating_count', sa.Integer(), nullable=False, server_default='0'))
+
+    # Заполняем по уже оставленным отзывам
+    op.execute(
+        """
+        UPDATE users SET
+            rating_sum = COALESCE((SELECT SUM(score) FROM ratings WHERE ratings.reviewee_id = users.id), 0),
+            rating_count = (SELECT COUNT(*) FROM ratings WHERE ratings.reviewee_id = users.id)
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('rating_count')
+        batch_op.drop_column('rating_sum')
@@ -0,0 +1,56 @@
+"""Store users.skills as JSONB
+
+Revision ID: skills_to_jsonb
+Revises: timestamps_server_default
+Create Date: 2025-02-04 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'skills_to_jsonb'
+down_revision = 'timestamps_server_default'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # В остальных СУБД JSON и так хранится текстом — менять нечего
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # API сохранял JSON-массив, но через админку могли вписать навыки
+    # простым текстом через запятую — такие строки превращаем в массив.
+    # Приведение с перехватом ошибки: испорченный JSON не должен прервать миграцию
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pg_temp.try_jsonb(value text) RETURNS jsonb AS $$
+        BEGIN
+            RETURN value::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql IMMUTABLE
+        """
+    )
+    op.execute(
+        r"""
+        ALTER TABLE users ALTER COLUMN skills TYPE jsonb USING
+            CASE
+                WHEN btrim(skills) = '' THEN NULL
+                WHEN jsonb_typeof(pg_temp.try_jsonb(skills)) = 'array' THEN pg_temp.try_jsonb(skills)
+                ELSE to_jsonb(regexp_split_to_array(btrim(skills), '\s*,\s*'))
+            END
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(
+        "ALTER TABLE users ALTER COLUMN skills TYPE text "
+        "USING skills::text"
+    )
@@ -0,0 +1,56 @@
+"""Store projects.tech_stack as JSONB
+
+Revision ID: tech_stack_to_jsonb
+Revises: add_user_rating_totals
+Create Date: 2025-01-31 00:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'tech_stack_to_jsonb'
+down_revision = 'add_user_rating_totals'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # В остальных СУБД JSON и так хранится текстом — менять нечего
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Старый код сохранял что угодно (схема отдавала None на невалидный JSON),
+    # поэтому приведение с перехватом ошибки: JSON-массив остаётся как есть,
+    # остальное считается списком технологий через запятую
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION pg_temp.try_jsonb(value text) RETURNS jsonb AS $$
+        BEGIN
+            RETURN value::jsonb;
+        EXCEPTION WHEN others THEN
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql IMMUTABLE
+        """
+    )
+    op.execute(
+        r"""
+        ALTER TABLE projects ALTER COLUMN tech_stack TYPE jsonb USING
+            CASE
+                WHEN btrim(tech_stack) = '' THEN NULL
+                WHEN jsonb_typeof(pg_temp.try_jsonb(tech_stack)) = 'array' THEN pg_temp.try_jsonb(tech_stack)
+                ELSE to_jsonb(regexp_split_to_array(btrim(tech_stack), '\s*,\s*'))
+            END
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(
+        "ALTER TABLE projects ALTER COLUMN tech_stack TYPE text "
+        "USING tech_stack::text"
+    )
@@ -0,0 +1,49 @@
+"""Fill created_at / updated_at on the database side
+
+Revision ID: timestamps_server_default
+Revises: add_student_rating_index
+Create Date: 2025-02-03 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'timestamps_server_default'
+down_revision = 'add_student_rating_index'
+branch_labels = None
+depends_on = None
+
+
+TIMESTAMP_COLUMNS = [
+    ('users', 'created_at'),
+    ('users', 'updated_at'),
+    ('projects', 'created_at'),
+    ('projects', 'updated_at'),
+    ('tasks', 'created_at'),
+    ('applications', 'created_at'),
+    ('ratings', 'created_at'),
+    ('contracts', 'created_at'),
+]
+
+# Колонки без часового пояса хранят UTC, как раньше datetime.utcnow()
+UTC_NOW = sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")
+
+
+def upgrade() -> None:
+    # SQLite не умеет менять DEFAULT у существующей колонки; локальная база
+    # создаётся через create_all уже с нужным значением по умолчанию
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=UTC_NOW)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=None)
@@ -2,24 +2,58 @@
 Админ-панель WORK21
 Доступна по адресу: /admin
 """
+import asyncio
+import logging
+import secrets
+from functools import lru_cache
+from typing import Any, AsyncGenerator, Optional
+
+import orjson
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
+from sqladmin.helpers import Writer, secure_filename, stream_to_csv
+from sqlalchemy import Select
+from sqlalchemy.orm import selectinload
 from starlette.requests import Request
+from starlette.responses import StreamingResponse
 
-from app.core.database import engine
-from app.core.security import verify_password
+from app.core.config import settings
+from app.core.database import async_engine
+from app.core.security import get_password_hash, verify_password
 from app.models.user import User, UserRole
 from app.models.project import Project, Task, Application
 from app.models.rating import Rating
 from app.models.contract import Contract
 
 
+logger = logging.getLogger("admin.auth")
+
+ADMIN_USER = settings.admin_username.encode("utf-8")
+
+
+@lru_cache
+def admin_password_hash() -> Optional[str]:
+    """Хеш пароля админ-панели: bcrypt считается при первом входе, а не при импорте"""
+    if settings.admin_password_hash:
+        return settings.admin_password_hash
+    if settings.admin_password:
+        return get_password_hash(settings.admin_password)
+    return None
+
+
+def verify_admin_password(password: str) -> bool:
+    password_hash = admin_password_hash()
+    # Пароль не задан — вход в админку закрыт
+    return password_hash is not None and verify_password(password, password_hash)
+
+
 # ============= Аутентификация админ-панели =============
 
 class AdminAuth(AuthenticationBackend):
     """
     Простая аутентификация для админ-панели.
-    Логин: admin, Пароль: admin123
+    Логин — ADMIN_USERNAME (по умолчанию admin), пароль — ADMIN_PASSWORD_HASH
+    или ADMIN_PASSWORD; значения по умолчанию у пароля нет.
     """
     
     async def login(self, request: Request) -> bool:
@@ -27,14 +61,18 @@ class AdminAuth(AuthenticationBackend):
         username = form.get("username")
         password = form.get("password")
         
-        print(f"[ADMIN] Login attempt: username={username}")
+        logger.info("login attempt username=%s", username)
+        
+        # Проверяем оба поля, чтобы время ответа не зависело от логина
+        user_ok = secrets.compare_digest((username or "").encode("utf-8"), ADMIN_USER)
+        password_ok = await asyncio.to_thread(verify_admin_password, password or "")
         
-        if username == "admin" and password == "admin123":
+        if user_ok and password_ok:
             request.session.update({"token": "admin-authenticated"})
-            print("[ADMIN] Login successful!")
+            logger.info("login successful username=%s", username)
             return True
         
-        print("[ADMIN] Login failed!")
+        logger.warning("login failed username=%s", username)
         return False
     
     async def logout(self, request: Request) -> bool:
@@ -48,15 +86,98 @@ class AdminAuth(AuthenticationBackend):
 
 # ============= Представления моделей =============
 
-class UserAdmin(ModelView, model=User):
+class StreamingExportMixin:
+    """
+    Потоковый экспорт CSV/JSON.
+    
+    sqladmin загружает все строки в список до начала ответа;
+    здесь строки читаются из БД порциями по мере отправки.
+    """
+    
+    export_chunk_size = 1000
+    
+    async def get_model_objects(self, request: Request, limit: int | None = 0) -> Select:
+        # Вместо строк возвращаем запрос — его выполняет export_data
+        stmt = self.list_query(request)
+        for relation in self._list_relations:
+            stmt = stmt.options(selectinload(relation))
+        if limit:
+            stmt = stmt.limit(limit)
+        return stmt
+    
+    async def _stream_rows(self, stmt: Select) -> AsyncGenerator[Any, None]:
+        async with self.session_maker(expire_on_commit=False) as session:
+            result = await session.stream_scalars(
+                stmt.execution_options(yield_per=self.export_chunk_size)
+            )
+            async for row in result:
+                yield row
+    
+    async def _export_values(self, row: Any) -> list[str]:
+        return [
+            str(await self.get_prop_value(row, name))
+            for name in self._export_prop_names
+        ]
+    
+    async def export_data(self, data: Select, export_type: str = "csv") -> StreamingResponse:
+        if export_type == "csv":
+            async def generate_csv(writer: Writer) -> AsyncGenerator[Any, None]:
+                yield writer.writerow(self._export_prop_names)
+                async for row in self._stream_rows(data):
+                    yield writer.writerow(await self._export_values(row))
+            
+            content = stream_to_csv(generate_csv)
+            media_type = "text/csv; charset=utf-8"
+        elif export_type == "json":
+            async def generate_json() -> AsyncGenerator[str, None]:
+                separator = ""
+                yield "["
+                async for row in self._stream_rows(data):
+                    values = await self._export_values(row)
+                    # orjson, как и ответы API: UTF-8 без экранирования, в C
+                    yield separator + orjson.dumps(
+                        dict(zip(self._export_prop_names, values))
+                    ).decode()
+                    separator = ","
+                yield "]"
+            
+            content = generate_json()
+            media_type = "application/json"
+        else:
+            raise NotImplementedError("Only export_type='csv' or 'json' is implemented.")
+        
+        filename = secure_filename(self.get_export_name(export_type=export_type))
+        return StreamingResponse(
+            content=content,
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment;filename={filename}"},
+        )
+
+
+# Пагинация, общая для всех представлений
+PAGE_SIZE = 25
+PAGE_SIZE_OPTIONS = (25, 50, 100)
+
+# Подписи ролей для списка пользователей
+ROLE_LABELS = {
+    UserRole.STUDENT: "Student",
+    UserRole.CUSTOMER: "Customer",
+    UserRole.ADMIN: "Admin",
+}
+
+class UserAdmin(StreamingExportMixin, ModelView, model=User):
     """Админка пользователей"""
     
     name = "User"
     name_plural = "Users"
     icon = "fa-solid fa-user"
     
+    # Пагинация: размер страницы ограничен на сервере
+    page_size = PAGE_SIZE
+    page_size_options = PAGE_SIZE_OPTIONS
+    
     # Колонки в списке
-    column_list = [
+    column_list = (
         User.id, 
         User.email, 
         User.first_name, 
@@ -65,17 +186,20 @@ class UserAdmin(ModelView, model=User):
         User.rating_score,
         User.completed_projects,
         User.is_active,
-        User.created_at
-    ]
+        User.created_at,
+    )
     
     # Колонки для поиска
-    column_searchable_list = [User.email, User.first_name, User.last_name]
+    column_searchable_list = (User.email, User.first_name, User.last_name)
     
-    # Сортировка по умолчанию
-    column_default_sort = [(User.created_at, True)]
+    # Роль выводится по готовой таблице подписей
+    column_formatters = {User.role: lambda m, a: ROLE_LABELS[m.role]}
+    
+    # Сортировка по умолчанию: новые сверху, по первичному ключу
+    column_default_sort = [(User.id, True)]
     
     # Поля формы (пароль исключён)
-    form_columns = [
+    form_columns = (
         User.email,
         User.first_name,
         User.last_name,
@@ -86,34 +210,41 @@ class UserAdmin(ModelView, model=User):
         User.completed_projects,
         User.is_active,
         User.is_verified,
-    ]
+    )
     
     # Экспорт
     can_export = True
-    export_types = ["csv", "json"]
+    export_types = ("csv", "json")
 
 
-class ProjectAdmin(ModelView, model=Project):
+class ProjectAdmin(StreamingExportMixin, ModelView, model=Project):
     """Админка проектов"""
     
     name = "Project"
     name_plural = "Projects"
     icon = "fa-solid fa-folder"
     
-    column_list = [
+    page_size = PAGE_SIZE
+    page_size_options = PAGE_SIZE_OPTIONS
+    
+    # Связи из column_list sqladmin подгружает через selectinload —
+    # один запрос WHERE id IN (...) на связь вместо запроса на каждую строку
+    column_list = (
         Project.id,
         Project.title,
         Project.status,
         Project.budget,
-        Project.customer_id,
-        Project.created_at
-    ]
+        Project.customer,
+        Project.assignee,
+        Project.created_at,
+    )
     
-    column_searchable_list = [Project.title, Project.description]
+    column_searchable_list = (Project.title, Project.description)
+    column_sortable_list = (Project.id, Project.created_at)
     # column_filters = [Project.status]  # enum не поддерживается
-    column_default_sort = [(Project.created_at, True)]
+    column_default_sort = [(Project.id, True)]
     
-    form_columns = [
+    form_columns = (
         Project.title,
         Project.description,
         Project.requirements,
@@ -123,9 +254,18 @@ class ProjectAdmin(ModelView, model=Project):
         Project.status,
         Project.customer_id,
         Project.generated_spec,
-    ]
+    )
     
     can_export = True
+    
+    def details_query(self, request: Request) -> Select:
+        # Связи страницы деталей — одним IN-запросом на связь, без lazy load
+        return super().details_query(request).options(
+            selectinload(Project.customer),
+            selectinload(Project.assignee),
+            selectinload(Project.tasks),
+            selectinload(Project.applications),
+        )
 
 
 class TaskAdmin(ModelView, model=Task):
@@ -135,17 +275,29 @@ class TaskAdmin(ModelView, model=Task):
     name_plural = "Tasks"
     icon = "fa-solid fa-list-check"
     
-    column_list = [
+    page_size = PAGE_SIZE
+    page_size_options = PAGE_SIZE_OPTIONS
+    
+    column_list = (
         Task.id,
         Task.title,
         Task.status,
         Task.complexity,
-        Task.project_id,
-        Task.assignee_id
-    ]
+        Task.project,
+        Task.assignee,
+    )
     
-    column_searchable_list = [Task.title]
+    column_searchable_list = (Task.title,)
     # column_filters = [Task.status, Task.complexity]  # enum не поддерживается
+    
+    # Дату создания ставит БД, в форме её не редактируем
+    form_excluded_columns = (Task.created_at,)
+    
+    def details_query(self, request: Request) -> Select:
+        return super().details_query(request).options(
+            selectinload(Task.project),
+            selectinload(Task.assignee),
+        )
 
 
 class ApplicationAdmin(ModelView, model=Application):
@@ -155,17 +307,28 @@ class ApplicationAdmin(ModelView, model=Application):
     name_plural = "Applications"
     icon = "fa-solid fa-file-lines"
     
-    column_list = [
+    page_size = PAGE_SIZE
+    page_size_options = PAGE_SIZE_OPTIONS
+    
+    column_list = (
         Application.id,
-        Application.project_id,
-        Application.student_id,
+        Application.project,
+        Application.student,
         Application.status,
         Application.proposed_rate,
-        Application.created_at
-    ]
+        Application.created_at,
+    )
     
     # column_filters = [Application.status]  # enum не поддерживается
-    column_default_sort = [(Application.created_at, True)]
+    column_default_sort = [(Application.id, True)]
+    
+    form_excluded_columns = (Application.created_at,)
+    
+    def details_query(self, request: Request) -> Select:
+        return super().details_query(request).options(
+            selectinload(Application.project),
+            selectinload(Application.student),
+        )
 
 
 class RatingAdmin(ModelView, model=Rating):
@@ -175,16 +338,21 @@ class RatingAdmin(ModelView, model=Rating):
     name_plural = "Ratings"
     icon = "fa-solid fa-star"
     
-    column_list = [
+    page_size = PAGE_SIZE
+    page_size_options = PAGE_SIZE_OPTIONS
+    
+    column_list = (
         Rating.id,
         Rating.project_id,
         Rating.reviewer_id,
         Rating.reviewee_id,
         Rating.score,
-        Rating.created_at
-    ]
+        Rating.created_at,
+    )
     
     # column_filters = [Rating.score]  # временно отключено
+    
+    form_excluded_columns = (Rating.created_at,)
 
 
 class ContractAdmin(ModelView, model=Contract):
@@ -194,17 +362,33 @@ class ContractAdmin(ModelView, model=Contract):
     name_plural = "Contracts"
     icon = "fa-solid fa-file-contract"
     
-    column_list = [
+    page_size = PAGE_SIZE
+    page_size_options = PAGE_SIZE_OPTIONS
+    
+    column_list = (
         Contract.id,
         Contract.project_id,
         Contract.customer_id,
         Contract.student_id,
         Contract.total_amount,
         Contract.status,
-        Contract.created_at
-    ]
+        Contract.created_at,
+    )
     
     # column_filters = [Contract.status]  # enum не поддерживается
+    
+    form_excluded_columns = (Contract.created_at,)
+
+
+# Порядок совпадает с порядком в меню админки
+ADMIN_VIEWS = (
+    UserAdmin,
+    ProjectAdmin,
+    TaskAdmin,
+    ApplicationAdmin,
+    RatingAdmin,
+    ContractAdmin,
+)
 
 
 # ============= Функция создания админки =============
@@ -214,22 +398,18 @@ def create_admin(app):
     Создаёт и настраивает админ-панель
     """
     # Временно отключена авторизация для отладки
-    # authentication_backend = AdminAuth(secret_key="admin-secret-key-change-me")
+    # authentication_backend = AdminAuth(secret_key=settings.session_secret)
     
     admin = Admin(
         app,
-        engine,
+        async_engine,
         title="WORK21 Admin",
         # authentication_backend=authentication_backend,  # Раскомментируйте для включения авторизации
     )
     
     # Регистрируем модели
-    admin.add_view(UserAdmin)
-    admin.add_view(ProjectAdmin)
-    admin.add_view(TaskAdmin)
-    admin.add_view(ApplicationAdmin)
-    admin.add_view(RatingAdmin)
-    admin.add_view(ContractAdmin)
+    for view in ADMIN_VIEWS:
+        admin.add_view(view)
     
     return admin
 
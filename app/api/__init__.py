@@ -7,10 +7,15 @@ from app.api import auth, users, projects, ratings, admin
 
 api_router = APIRouter()
 
-api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
-api_router.include_router(users.router, prefix="/users", tags=["users"])
-api_router.include_router(projects.router, prefix="/projects", tags=["projects"])
-api_router.include_router(ratings.router, prefix="/ratings", tags=["ratings"])
-api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+# (модуль, префикс) — тег совпадает с префиксом без "/"
+ROUTERS = (
+    (auth, "/auth"),
+    (users, "/users"),
+    (projects, "/projects"),
+    (ratings, "/ratings"),
+    (admin, "/admin"),
+)
 
+for module, prefix in ROUTERS:
+    api_router.include_router(module.router, prefix=prefix, tags=[prefix[1:]])
 
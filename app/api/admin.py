@@ -1,15 +1,28 @@
 """
 API endpoints для админ-панели
 """
-from typing import Optional, List
+import asyncio
+import base64
+import csv
+import hashlib
+import io
+import json
+import logging
 from datetime import datetime
+from enum import Enum
+from typing import Optional, List
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, update, delete
-from pydantic import BaseModel, EmailStr, Field
-
-from app.core.database import get_db
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy import select, insert, func, or_, update, delete, text, true, tuple_, literal, case, cast, Float, String
+from sqlalchemy.orm import load_only
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
+
+from app.core.cache import TTLCache, application_cache, project_cache, rating_cache, student_cache, user_cache
+from app.core.config import settings
+from app.core.database import async_engine, async_session_maker, get_db
 from app.core.security import get_password_hash
 from app.api.deps import get_current_admin_user
 from app.models.user import User, UserRole
@@ -18,6 +31,14 @@ from app.models.rating import Rating
 from app.models.contract import Contract, ContractStatus
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Статистика меняется медленно — кэшируем на несколько секунд
+STATS_CACHE_KEY = "admin:stats"
+stats_cache = TTLCache(ttl=settings.stats_cache_ttl)
+
+# Размер пачки строк при потоковой выгрузке
+EXPORT_CHUNK_SIZE = 500
 
 
 # ============= Схемы =============
@@ -47,15 +68,13 @@ class PaginatedResponse(BaseModel):
     pages: int
 
 
-class UserAdminResponse(BaseModel):
-    """Ответ с данными пользователя для админки"""
+class UserAdminListItem(BaseModel):
+    """Пользователь в списке админки (без длинных текстовых полей профиля)"""
     id: int
     email: str
     first_name: str
     last_name: str
-    role: str
-    bio: Optional[str] = None
-    skills: Optional[str] = None
+    role: UserRole
     avatar_url: Optional[str] = None
     rating_score: float
     completed_projects: int
@@ -66,6 +85,13 @@ class UserAdminResponse(BaseModel):
 
     class Config:
         from_attributes = True
+        use_enum_values = True
+
+
+class UserAdminResponse(UserAdminListItem):
+    """Ответ с данными пользователя для админки"""
+    bio: Optional[str] = None
+    skills: Optional[List[str]] = None
 
 
 class UserAdminUpdate(BaseModel):
@@ -75,7 +101,7 @@ class UserAdminUpdate(BaseModel):
     last_name: Optional[str] = Field(None, min_length=1, max_length=100)
     role: Optional[UserRole] = None
     bio: Optional[str] = None
-    skills: Optional[str] = None
+    skills: Optional[List[str]] = None
     rating_score: Optional[float] = Field(None, ge=0, le=5)
     completed_projects: Optional[int] = Field(None, ge=0)
     is_active: Optional[bool] = None
@@ -95,7 +121,7 @@ class UserAdminCreate(BaseModel):
     last_name: str = Field(..., min_length=1, max_length=100)
     role: UserRole
     bio: Optional[str] = None
-    skills: Optional[str] = None
+    skills: Optional[List[str]] = None
     is_active: bool = True
     is_verified: bool = False
 
@@ -107,31 +133,36 @@ class ProjectAdminCreate(BaseModel):
     requirements: Optional[str] = None
     budget: float = Field(..., ge=0)
     deadline: Optional[datetime] = None
-    tech_stack: Optional[str] = None
+    tech_stack: Optional[List[str]] = None
     status: ProjectStatus = ProjectStatus.DRAFT
     customer_id: int
     assignee_id: Optional[int] = None
 
 
-class ProjectAdminResponse(BaseModel):
-    """Ответ с данными проекта для админки"""
+class ProjectAdminListItem(BaseModel):
+    """Проект в списке админки (без ТЗ и оценки LLM)"""
     id: int
     title: str
     description: str
     requirements: Optional[str] = None
     budget: float
     deadline: Optional[datetime] = None
-    tech_stack: Optional[str] = None
-    status: str
+    tech_stack: Optional[List[str]] = None
+    status: ProjectStatus
     customer_id: int
     assignee_id: Optional[int] = None
-    generated_spec: Optional[str] = None
-    llm_estimation: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+        use_enum_values = True
+
+
+class ProjectAdminResponse(ProjectAdminListItem):
+    """Ответ с данными проекта для админки"""
+    generated_spec: Optional[str] = None
+    llm_estimation: Optional[str] = None
 
 
 class ProjectAdminUpdate(BaseModel):
@@ -141,7 +172,7 @@ class ProjectAdminUpdate(BaseModel):
     requirements: Optional[str] = None
     budget: Optional[float] = None
     deadline: Optional[datetime] = None
-    tech_stack: Optional[str] = None
+    tech_stack: Optional[List[str]] = None
     status: Optional[ProjectStatus] = None
     customer_id: Optional[int] = None
     assignee_id: Optional[int] = None
@@ -156,11 +187,12 @@ class ApplicationAdminResponse(BaseModel):
     student_id: int
     cover_letter: Optional[str] = None
     proposed_rate: Optional[float] = None
-    status: str
+    status: ApplicationStatus
     created_at: datetime
 
     class Config:
         from_attributes = True
+        use_enum_values = True
 
 
 class ApplicationAdminUpdate(BaseModel):
@@ -175,13 +207,14 @@ class ContractAdminResponse(BaseModel):
     customer_id: int
     student_id: int
     total_amount: float
-    status: str
+    status: ContractStatus
     signed_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+        use_enum_values = True
 
 
 class RatingAdminResponse(BaseModel):
@@ -198,65 +231,375 @@ class RatingAdminResponse(BaseModel):
         from_attributes = True
 
 
+# Списки валидируются пачкой в pydantic-core, без построения моделей по одной
+USER_LIST_ADAPTER = TypeAdapter(List[UserAdminListItem])
+PROJECT_LIST_ADAPTER = TypeAdapter(List[ProjectAdminListItem])
+APPLICATION_LIST_ADAPTER = TypeAdapter(List[ApplicationAdminResponse])
+CONTRACT_LIST_ADAPTER = TypeAdapter(List[ContractAdminResponse])
+RATING_LIST_ADAPTER = TypeAdapter(List[RatingAdminResponse])
+
+
+# Для списков из БД читаются только колонки схемы элемента
+USER_LIST_COLUMNS = load_only(*(getattr(User, name) for name in UserAdminListItem.model_fields))
+PROJECT_LIST_COLUMNS = load_only(*(getattr(Project, name) for name in ProjectAdminListItem.model_fields))
+
+
+# Колонки CSV-выгрузки пользователей; роль — строкой, как в ответах API
+USER_EXPORT_COLUMNS = (
+    User.id,
+    User.email,
+    User.first_name,
+    User.last_name,
+    func.lower(cast(User.role, String)).label("role"),
+    User.is_active,
+    User.is_verified,
+    User.created_at,
+)
+
+
+# ============= Пагинация =============
+
+# Допустимые значения sort_by (только NOT NULL колонки — для курсора)
+USER_SORTABLE = {
+    "created_at": User.created_at,
+    "updated_at": User.updated_at,
+    "rating_score": User.rating_score,
+    "email": User.email,
+    "id": User.id,
+}
+PROJECT_SORTABLE = {
+    "created_at": Project.created_at,
+    "updated_at": Project.updated_at,
+    "budget": Project.budget,
+    "title": Project.title,
+    "id": Project.id,
+}
+APPLICATION_SORTABLE = {
+    "created_at": Application.created_at,
+    "id": Application.id,
+}
+CONTRACT_SORTABLE = {
+    "created_at": Contract.created_at,
+    "total_amount": Contract.total_amount,
+    "id": Contract.id,
+}
+RATING_SORTABLE = {
+    "created_at": Rating.created_at,
+    "score": Rating.score,
+    "id": Rating.id,
+}
+
+
+def _sort_column(sortable: dict, sort_by: str):
+    """Колонка сортировки из белого списка"""
+    sort_column = sortable.get(sort_by)
+    if sort_column is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Недопустимое поле сортировки: {sort_by}. Доступны: {', '.join(sortable)}"
+        )
+    return sort_column
+
+
+def _encode_cursor(sort_value, row_id: int) -> str:
+    """Курсор keyset-пагинации: значение сортировки и id последней строки"""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    elif isinstance(sort_value, Enum):
+        sort_value = sort_value.value
+    raw = json.dumps([sort_value, row_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def _decode_cursor(cursor: str, sort_column) -> tuple:
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        python_type = sort_column.type.python_type
+        if python_type is datetime:
+            sort_value = datetime.fromisoformat(sort_value)
+        elif sort_value is not None:
+            sort_value = python_type(sort_value)
+        return sort_value, int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+def _paginate(query, model, sort_column, sort_order: str, page: int, per_page: int, cursor: Optional[str]):
+    """
+    Сортировка с id как вторым ключом и пагинация.
+    
+    С курсором страница ищется по индексу от последней строки (keyset),
+    без курсора — по номеру страницы через OFFSET.
+    """
+    descending = sort_order == "desc"
+    
+    if cursor:
+        sort_value, last_id = _decode_cursor(cursor, sort_column)
+        key = tuple_(sort_column, model.id)
+        query = query.where(key < (sort_value, last_id) if descending else key > (sort_value, last_id))
+    else:
+        query = query.offset((page - 1) * per_page)
+    
+    return _order(query, model, sort_column, sort_order).limit(per_page)
+
+
+def _order(query, model, sort_column, sort_order: str):
+    """Сортировка по выбранной колонке с id как вторым ключом"""
+    if sort_order == "desc":
+        return query.order_by(sort_column.desc(), model.id.desc())
+    return query.order_by(sort_column.asc(), model.id.asc())
+
+
+def _stream_ndjson(query, schema: type[BaseModel]) -> StreamingResponse:
+    """
+    Выгрузка всех строк запроса в NDJSON.
+    
+    Строки читаются серверным курсором пачками по EXPORT_CHUNK_SIZE,
+    так что память не растёт с размером выборки. Сессия открывается
+    своя: сессия из get_db закрывается до того, как начнётся отдача тела.
+    """
+    async def generate():
+        async with async_session_maker() as session:
+            result = await session.stream_scalars(
+                query.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+            )
+            async for partition in result.partitions():
+                yield "".join(
+                    schema.model_validate(row).model_dump_json() + "\n"
+                    for row in partition
+                )
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+async def _copy_csv(query):
+    """
+    Выгрузка запроса в CSV через COPY ... TO STDOUT (asyncpg).
+    
+    Строки идут из PostgreSQL в ответ напрямую, без ORM и pydantic.
+    Очередь ограничена, поэтому COPY ждёт, пока клиент читает ответ.
+    """
+    sql = str(query.compile(async_engine, compile_kwargs={"literal_binds": True}))
+    chunks: asyncio.Queue = asyncio.Queue(maxsize=16)
+    
+    async def copy():
+        try:
+            async with async_engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                await raw.driver_connection.copy_from_query(
+                    sql, output=chunks.put, format="csv", header=True
+                )
+        finally:
+            # Маркер конца не нужен, если выгрузку отменили (клиент отключился)
+            if not asyncio.current_task().cancelling():
+                await chunks.put(None)
+    
+    task = asyncio.create_task(copy())
+    try:
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+        # Пробрасываем ошибку COPY, если она была
+        await task
+    finally:
+        task.cancel()
+
+
+async def _stream_csv(query):
+    """Выгрузка запроса в CSV пачками строк, для драйверов без COPY"""
+    async with async_engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(result.keys())
+        async for partition in result.partitions():
+            writer.writerows(partition)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+
+async def _fetch_page(
+    db: AsyncSession,
+    query,
+    count_query,
+    model,
+    sort_column,
+    sort_order: str,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+) -> tuple[list, int]:
+    """
+    Получить страницу и общее количество строк.
+    
+    По номеру страницы total считается оконной функцией в том же запросе.
+    Условие курсора отсекает часть строк, поэтому с курсором total —
+    отдельный COUNT.
+    """
+    if cursor:
+        total = await db.scalar(count_query) or 0
+        result = await db.execute(
+            _paginate(query, model, sort_column, sort_order, page, per_page, cursor)
+        )
+        return list(result.scalars().all()), total
+    
+    query = query.add_columns(func.count().over().label("total"))
+    result = await db.execute(
+        _paginate(query, model, sort_column, sort_order, page, per_page, cursor)
+    )
+    rows = result.all()
+    if rows:
+        return [row[0] for row in rows], rows[0].total
+    
+    # Страница за пределами списка — окно пустое, считаем отдельно
+    if page == 1:
+        return [], 0
+    return [], await db.scalar(count_query) or 0
+
+
+def _next_cursor(rows, sort_column, per_page: int) -> Optional[str]:
+    """Курсор следующей страницы (None, если страница последняя)"""
+    if len(rows) < per_page:
+        return None
+    last = rows[-1]
+    sort_value = getattr(last, sort_column.key)
+    if sort_value is None:
+        return None
+    return _encode_cursor(sort_value, last.id)
+
+
 # ============= Статистика =============
 
+def _build_stats_query():
+    """Запрос статистики: по одному агрегату на таблицу, все четыре — в одном запросе"""
+    users = select(
+        func.count(User.id).label("total"),
+        func.count(User.id).filter(User.role == UserRole.STUDENT).label("students"),
+        func.count(User.id).filter(User.role == UserRole.CUSTOMER).label("customers"),
+        func.count(User.id).filter(User.role == UserRole.ADMIN).label("admins"),
+    ).subquery()
+    
+    projects = select(
+        func.count(Project.id).label("total"),
+        func.count(Project.id).filter(Project.status == ProjectStatus.OPEN).label("open"),
+        func.count(Project.id).filter(Project.status == ProjectStatus.IN_PROGRESS).label("in_progress"),
+        func.count(Project.id).filter(Project.status == ProjectStatus.COMPLETED).label("completed"),
+    ).subquery()
+    
+    applications = select(
+        func.count(Application.id).label("total"),
+        func.count(Application.id).filter(Application.status == ApplicationStatus.PENDING).label("pending"),
+    ).subquery()
+    
+    contracts = select(
+        func.count(Contract.id).label("total"),
+        func.count(Contract.id).filter(Contract.status == ContractStatus.ACTIVE).label("active"),
+    ).subquery()
+    
+    return (
+        select(
+            users.c.total.label("total_users"),
+            users.c.students.label("total_students"),
+            users.c.customers.label("total_customers"),
+            users.c.admins.label("total_admins"),
+            projects.c.total.label("total_projects"),
+            projects.c.open.label("open_projects"),
+            projects.c.in_progress.label("in_progress_projects"),
+            projects.c.completed.label("completed_projects"),
+            applications.c.total.label("total_applications"),
+            applications.c.pending.label("pending_applications"),
+            contracts.c.total.label("total_contracts"),
+            contracts.c.active.label("active_contracts"),
+        )
+        # Каждый подзапрос — ровно одна строка, соединяем без условия
+        .select_from(
+            users.join(projects, true())
+            .join(applications, true())
+            .join(contracts, true())
+        )
+    )
+
+
+# Запрос не зависит от параметров — строим его один раз при импорте
+STATS_QUERY = _build_stats_query()
+
+# В PostgreSQL статистика читается из admin_stats_mv (миграция add_admin_stats_mv),
+# которое фоново обновляет refresh_stats_view. Включается при старте в check_stats_view,
+# только если представление действительно создано: миграции на новой базе могут не пройти
+STATS_VIEW_ENABLED = settings.stats_refresh_interval > 0 and settings.database_url.startswith("postgresql")
+USE_STATS_VIEW = False
+STATS_VIEW_QUERY = text(f"SELECT {', '.join(StatsResponse.model_fields)} FROM admin_stats_mv")
+# Ключ advisory-блокировки пересчёта admin_stats_mv (произвольная константа)
+STATS_REFRESH_LOCK = 2102
+
+
 @router.get("/stats", response_model=StatsResponse)
 async def get_admin_stats(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
-    """Получить общую статистику платформы"""
-    
-    # Пользователи
-    total_users = await db.scalar(select(func.count(User.id))) or 0
-    total_students = await db.scalar(
-        select(func.count(User.id)).where(User.role == UserRole.STUDENT)
-    ) or 0
-    total_customers = await db.scalar(
-        select(func.count(User.id)).where(User.role == UserRole.CUSTOMER)
-    ) or 0
-    total_admins = await db.scalar(
-        select(func.count(User.id)).where(User.role == UserRole.ADMIN)
-    ) or 0
-    
-    # Проекты
-    total_projects = await db.scalar(select(func.count(Project.id))) or 0
-    open_projects = await db.scalar(
-        select(func.count(Project.id)).where(Project.status == ProjectStatus.OPEN)
-    ) or 0
-    in_progress_projects = await db.scalar(
-        select(func.count(Project.id)).where(Project.status == ProjectStatus.IN_PROGRESS)
-    ) or 0
-    completed_projects = await db.scalar(
-        select(func.count(Project.id)).where(Project.status == ProjectStatus.COMPLETED)
-    ) or 0
-    
-    # Заявки
-    total_applications = await db.scalar(select(func.count(Application.id))) or 0
-    pending_applications = await db.scalar(
-        select(func.count(Application.id)).where(Application.status == ApplicationStatus.PENDING)
-    ) or 0
-    
-    # Контракты
-    total_contracts = await db.scalar(select(func.count(Contract.id))) or 0
-    active_contracts = await db.scalar(
-        select(func.count(Contract.id)).where(Contract.status == ContractStatus.ACTIVE)
-    ) or 0
-    
-    return StatsResponse(
-        total_users=total_users,
-        total_students=total_students,
-        total_customers=total_customers,
-        total_admins=total_admins,
-        total_projects=total_projects,
-        open_projects=open_projects,
-        in_progress_projects=in_progress_projects,
-        completed_projects=completed_projects,
-        total_applications=total_applications,
-        pending_applications=pending_applications,
-        total_contracts=total_contracts,
-        active_contracts=active_contracts,
-    )
+    """
+    Получить общую статистику платформы.
+    
+    Дашборд опрашивает статистику часто, а она меняется редко: ответ
+    помечается ETag, и при совпадении If-None-Match отдаётся 304 без тела.
+    """
+    stats = await stats_cache.get_or_set(STATS_CACHE_KEY, lambda: _compute_stats(db))
+    etag = _stats_etag(stats)
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    return stats
+
+
+def _stats_etag(stats: StatsResponse) -> str:
+    """Слабый ETag по содержимому статистики"""
+    digest = hashlib.sha1(stats.model_dump_json().encode("utf-8")).hexdigest()
+    return f'W/"{digest[:16]}"'
+
+
+async def _compute_stats(db: AsyncSession) -> StatsResponse:
+    """Посчитать статистику платформы"""
+    result = await db.execute(STATS_VIEW_QUERY if USE_STATS_VIEW else STATS_QUERY)
+    return StatsResponse(**result.one()._mapping)
+
+
+async def check_stats_view() -> bool:
+    """
+    Проверить при старте, что admin_stats_mv существует, и включить чтение из него.
+    Без представления статистика считается запросом по таблицам
+    """
+    global USE_STATS_VIEW
+    if STATS_VIEW_ENABLED:
+        async with async_engine.connect() as conn:
+            USE_STATS_VIEW = await conn.scalar(text("SELECT to_regclass('admin_stats_mv') IS NOT NULL"))
+        if not USE_STATS_VIEW:
+            logger.warning("admin_stats_mv not found, admin stats are computed from tables")
+    return USE_STATS_VIEW
+
+
+async def refresh_stats_view() -> None:
+    """
+    Периодически пересчитывать admin_stats_mv.
+    
+    CONCURRENTLY не блокирует чтение представления на время пересчёта.
+    Запускается из lifespan приложения, если check_stats_view нашла представление. При нескольких
+    воркерах uvicorn пересчитывает тот, кто первым взял advisory-блокировку.
+    """
+    while True:
+        await asyncio.sleep(settings.stats_refresh_interval)
+        try:
+            async with async_engine.begin() as conn:
+                if await conn.scalar(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": STATS_REFRESH_LOCK}):
+                    await conn.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY admin_stats_mv"))
+        except Exception:
+            logger.exception("admin_stats_mv refresh failed")
+            continue
+        stats_cache.invalidate(STATS_CACHE_KEY)
 
 
 # ============= Пользователи =============
@@ -265,15 +608,21 @@ async def get_admin_stats(
 async def list_users(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     role: Optional[UserRole] = None,
     is_active: Optional[bool] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
+    export: bool = False,
     db: AsyncSession = Depends(get_db),
     current_admin: User = Depends(get_current_admin_user)
 ):
-    """Получить список пользователей с фильтрацией и пагинацией"""
+    """
+    Получить список пользователей с фильтрацией и пагинацией.
+    
+    С export=true отдаются все подходящие пользователи потоком NDJSON, без пагинации.
+    """
     
     query = select(User)
     count_query = select(func.count(User.id))
@@ -296,46 +645,22 @@ async def list_users(
         query = query.where(User.is_active == is_active)
         count_query = count_query.where(User.is_active == is_active)
     
-    # Подсчёт
-    total = await db.scalar(count_query) or 0
-    
-    # Сортировка
-    sort_column = getattr(User, sort_by, User.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
-    
-    # Пагинация
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
+    sort_column = _sort_column(USER_SORTABLE, sort_by)
+    if export:
+        return _stream_ndjson(_order(query, User, sort_column, sort_order), UserAdminResponse)
     
-    result = await db.execute(query)
-    users = result.scalars().all()
+    # Сортировка, пагинация и подсчёт
+    users, total = await _fetch_page(
+        db, query.options(USER_LIST_COLUMNS), count_query, User, sort_column, sort_order, page, per_page, cursor
+    )
     
     return {
-        "items": [
-            UserAdminResponse(
-                id=u.id,
-                email=u.email,
-                first_name=u.first_name,
-                last_name=u.last_name,
-                role=u.role.value,
-                bio=u.bio,
-                skills=u.skills,
-                avatar_url=u.avatar_url,
-                rating_score=u.rating_score,
-                completed_projects=u.completed_projects,
-                is_active=u.is_active,
-                is_verified=u.is_verified,
-                created_at=u.created_at,
-                updated_at=u.updated_at,
-            ) for u in users
-        ],
+        "items": USER_LIST_ADAPTER.validate_python(users),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if per_page > 0 else 0,
+        "next_cursor": _next_cursor(users, sort_column, per_page),
     }
 
 
@@ -347,36 +672,56 @@ async def create_user(
 ):
     """Создать нового пользователя"""
     
-    # Проверяем что email не занят
-    result = await db.execute(select(User).where(User.email == data.email))
-    existing_user = result.scalar_one_or_none()
+    # bcrypt считается долго — хешируем в потоке, чтобы не блокировать event loop
+    hashed_password = await asyncio.to_thread(get_password_hash, data.password)
+    
+    # Создаём пользователя: INSERT ... ON CONFLICT DO NOTHING RETURNING id.
+    # Занятый email проверяет уникальный индекс, без отдельного SELECT и гонки
+    user_id = await db.scalar(
+        pg_insert(User)
+        .values(
+            email=data.email,
+            hashed_password=hashed_password,
+            first_name=data.first_name,
+            last_name=data.last_name,
+            role=data.role,
+            bio=data.bio,
+            skills=data.skills,
+            is_active=data.is_active,
+            is_verified=data.is_verified,
+            rating_score=0.0,
+            completed_projects=0,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User.id)
+    )
     
-    if existing_user:
+    if user_id is None:
         raise HTTPException(
             status_code=400, 
             detail=f"Пользователь с email {data.email} уже существует"
         )
     
-    # Создаём пользователя
-    user = User(
-        email=data.email,
-        hashed_password=get_password_hash(data.password),
-        first_name=data.first_name,
-        last_name=data.last_name,
-        role=data.role,
-        bio=data.bio,
-        skills=data.skills,
-        is_active=data.is_active,
-        is_verified=data.is_verified,
-        rating_score=0.0,
-        completed_projects=0,
-    )
-    
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    student_cache.invalidate()
     
-    return {"message": "Пользователь создан", "id": user.id}
+    return {"message": "Пользователь создан", "id": user_id}
+
+
+@router.get("/users/export")
+async def export_users(
+    current_admin: User = Depends(get_current_admin_user)
+):
+    """Выгрузить всех пользователей в CSV"""
+    query = select(*USER_EXPORT_COLUMNS).order_by(User.id)
+    content = _copy_csv(query) if async_engine.dialect.driver == "asyncpg" else _stream_csv(query)
+    
+    return StreamingResponse(
+        content,
+        media_type="text/csv; charset=utf-8",
+        headers={"Content-Disposition": 'attachment; filename="users.csv"'},
+    )
 
 
 @router.get("/users/{user_id}", response_model=UserAdminResponse)
@@ -393,22 +738,7 @@ async def get_user(
     if not user:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    return UserAdminResponse(
-        id=user.id,
-        email=user.email,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        role=user.role.value,
-        bio=user.bio,
-        skills=user.skills,
-        avatar_url=user.avatar_url,
-        rating_score=user.rating_score,
-        completed_projects=user.completed_projects,
-        is_active=user.is_active,
-        is_verified=user.is_verified,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-    )
+    return UserAdminResponse.model_validate(user)
 
 
 @router.patch("/users/{user_id}")
@@ -420,21 +750,23 @@ async def update_user(
 ):
     """Обновить данные пользователя"""
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Обновляем только переданные поля: UPDATE ... RETURNING id
+    update_data = data.model_dump(exclude_unset=True)
+    if update_data:
+        stmt = update(User).where(User.id == user_id).values(**update_data).returning(User.id)
+    else:
+        stmt = select(User.id).where(User.id == user_id)
     
-    if not user:
+    if await db.scalar(stmt) is None:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    # Обновляем только переданные поля
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
     await db.commit()
-    await db.refresh(user)
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    project_cache.invalidate()
+    student_cache.invalidate()
+    user_cache.invalidate(user_id)
     
-    return {"message": "Пользователь обновлён", "user_id": user.id}
+    return {"message": "Пользователь обновлён", "user_id": user_id}
 
 
 @router.post("/users/{user_id}/reset-password")
@@ -446,18 +778,21 @@ async def reset_user_password(
 ):
     """Сбросить пароль пользователя"""
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Хешируем новый пароль в потоке и обновляем одним UPDATE
+    hashed_password = await asyncio.to_thread(get_password_hash, data.new_password)
+    email = await db.scalar(
+        update(User)
+        .where(User.id == user_id)
+        .values(hashed_password=hashed_password)
+        .returning(User.email)
+    )
     
-    if not user:
+    if email is None:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    # Хешируем новый пароль
-    user.hashed_password = get_password_hash(data.new_password)
-    
     await db.commit()
     
-    return {"message": f"Пароль пользователя {user.email} успешно изменён"}
+    return {"message": f"Пароль пользователя {email} успешно изменён"}
 
 
 @router.post("/users/{user_id}/block")
@@ -468,19 +803,21 @@ async def block_user(
 ):
     """Заблокировать пользователя"""
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    if user_id == current_admin.id:
+        raise HTTPException(status_code=400, detail="Нельзя заблокировать самого себя")
     
-    if not user:
-        raise HTTPException(status_code=404, detail="Пользователь не найден")
+    email = await db.scalar(
+        update(User).where(User.id == user_id).values(is_active=False).returning(User.email)
+    )
     
-    if user.id == current_admin.id:
-        raise HTTPException(status_code=400, detail="Нельзя заблокировать самого себя")
+    if email is None:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    user.is_active = False
     await db.commit()
+    student_cache.invalidate()
+    user_cache.invalidate(user_id)
     
-    return {"message": f"Пользователь {user.email} заблокирован"}
+    return {"message": f"Пользователь {email} заблокирован"}
 
 
 @router.post("/users/{user_id}/unblock")
@@ -491,16 +828,18 @@ async def unblock_user(
 ):
     """Разблокировать пользователя"""
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    email = await db.scalar(
+        update(User).where(User.id == user_id).values(is_active=True).returning(User.email)
+    )
     
-    if not user:
+    if email is None:
         raise HTTPException(status_code=404, detail="Пользователь не найден")
     
-    user.is_active = True
     await db.commit()
+    student_cache.invalidate()
+    user_cache.invalidate(user_id)
     
-    return {"message": f"Пользователь {user.email} разблокирован"}
+    return {"message": f"Пользователь {email} разблокирован"}
 
 
 @router.delete("/users/{user_id}")
@@ -511,20 +850,27 @@ async def delete_user(
 ):
     """Удалить пользователя (мягкое удаление)"""
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="Пользователь не найден")
-    
-    if user.id == current_admin.id:
+    if user_id == current_admin.id:
         raise HTTPException(status_code=400, detail="Нельзя удалить самого себя")
     
-    # Мягкое удаление
-    user.is_active = False
-    user.email = f"deleted_{user.id}_{user.email}"
+    # Мягкое удаление: email переименовывается на стороне БД
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            is_active=False,
+            email=literal("deleted_") + cast(User.id, String) + "_" + User.email,
+        )
+    )
+    
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
     
     await db.commit()
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    project_cache.invalidate()
+    student_cache.invalidate()
+    user_cache.invalidate(user_id)
     
     return {"message": "Пользователь удалён"}
 
@@ -535,6 +881,7 @@ async def delete_user(
 async def list_projects(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     search: Optional[str] = None,
     status: Optional[ProjectStatus] = None,
     sort_by: str = "created_at",
@@ -544,7 +891,7 @@ async def list_projects(
 ):
     """Получить список проектов"""
     
-    query = select(Project)
+    query = select(Project).options(PROJECT_LIST_COLUMNS)
     count_query = select(func.count(Project.id))
     
     if search:
@@ -559,43 +906,19 @@ async def list_projects(
         query = query.where(Project.status == status)
         count_query = count_query.where(Project.status == status)
     
-    total = await db.scalar(count_query) or 0
-    
-    sort_column = getattr(Project, sort_by, Project.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
-    
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
-    
-    result = await db.execute(query)
-    projects = result.scalars().all()
+    # Сортировка, пагинация и подсчёт
+    sort_column = _sort_column(PROJECT_SORTABLE, sort_by)
+    projects, total = await _fetch_page(
+        db, query, count_query, Project, sort_column, sort_order, page, per_page, cursor
+    )
     
     return {
-        "items": [
-            ProjectAdminResponse(
-                id=p.id,
-                title=p.title,
-                description=p.description,
-                requirements=p.requirements,
-                budget=p.budget,
-                deadline=p.deadline,
-                tech_stack=p.tech_stack,
-                status=p.status.value,
-                customer_id=p.customer_id,
-                assignee_id=p.assignee_id,
-                generated_spec=p.generated_spec,
-                llm_estimation=p.llm_estimation,
-                created_at=p.created_at,
-                updated_at=p.updated_at,
-            ) for p in projects
-        ],
+        "items": PROJECT_LIST_ADAPTER.validate_python(projects),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if per_page > 0 else 0,
+        "next_cursor": _next_cursor(projects, sort_column, per_page),
     }
 
 
@@ -607,38 +930,39 @@ async def create_project(
 ):
     """Создать новый проект"""
     
-    # Проверяем что заказчик существует
-    result = await db.execute(select(User).where(User.id == data.customer_id))
-    customer = result.scalar_one_or_none()
+    # Проверяем заказчика и исполнителя (если указан) одним запросом
+    user_ids = [data.customer_id]
+    if data.assignee_id:
+        user_ids.append(data.assignee_id)
+    found = set(await db.scalars(select(User.id).where(User.id.in_(user_ids))))
     
-    if not customer:
+    if data.customer_id not in found:
         raise HTTPException(status_code=400, detail="Заказчик не найден")
     
-    # Проверяем исполнителя если указан
-    if data.assignee_id:
-        result = await db.execute(select(User).where(User.id == data.assignee_id))
-        assignee = result.scalar_one_or_none()
-        if not assignee:
-            raise HTTPException(status_code=400, detail="Исполнитель не найден")
-    
-    # Создаём проект
-    project = Project(
-        title=data.title,
-        description=data.description,
-        requirements=data.requirements,
-        budget=data.budget,
-        deadline=data.deadline,
-        tech_stack=data.tech_stack,
-        status=data.status,
-        customer_id=data.customer_id,
-        assignee_id=data.assignee_id,
+    if data.assignee_id and data.assignee_id not in found:
+        raise HTTPException(status_code=400, detail="Исполнитель не найден")
+    
+    # Создаём проект: INSERT ... RETURNING id без повторного SELECT
+    project_id = await db.scalar(
+        insert(Project)
+        .values(
+            title=data.title,
+            description=data.description,
+            requirements=data.requirements,
+            budget=data.budget,
+            deadline=data.deadline,
+            tech_stack=data.tech_stack,
+            status=data.status,
+            customer_id=data.customer_id,
+            assignee_id=data.assignee_id,
+        )
+        .returning(Project.id)
     )
-    
-    db.add(project)
     await db.commit()
-    await db.refresh(project)
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    project_cache.invalidate()
     
-    return {"message": "Проект создан", "id": project.id}
+    return {"message": "Проект создан", "id": project_id}
 
 
 @router.get("/projects/{project_id}", response_model=ProjectAdminResponse)
@@ -655,22 +979,7 @@ async def get_project(
     if not project:
         raise HTTPException(status_code=404, detail="Проект не найден")
     
-    return ProjectAdminResponse(
-        id=project.id,
-        title=project.title,
-        description=project.description,
-        requirements=project.requirements,
-        budget=project.budget,
-        deadline=project.deadline,
-        tech_stack=project.tech_stack,
-        status=project.status.value,
-        customer_id=project.customer_id,
-        assignee_id=project.assignee_id,
-        generated_spec=project.generated_spec,
-        llm_estimation=project.llm_estimation,
-        created_at=project.created_at,
-        updated_at=project.updated_at,
-    )
+    return ProjectAdminResponse.model_validate(project)
 
 
 @router.patch("/projects/{project_id}")
@@ -682,20 +991,20 @@ async def update_project(
 ):
     """Обновить проект"""
     
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
+    update_data = data.model_dump(exclude_unset=True)
+    if update_data:
+        stmt = update(Project).where(Project.id == project_id).values(**update_data).returning(Project.id)
+    else:
+        stmt = select(Project.id).where(Project.id == project_id)
     
-    if not project:
+    if await db.scalar(stmt) is None:
         raise HTTPException(status_code=404, detail="Проект не найден")
     
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(project, field, value)
-    
     await db.commit()
-    await db.refresh(project)
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    project_cache.invalidate()
     
-    return {"message": "Проект обновлён", "project_id": project.id}
+    return {"message": "Проект обновлён", "project_id": project_id}
 
 
 @router.delete("/projects/{project_id}")
@@ -706,15 +1015,17 @@ async def delete_project(
 ):
     """Удалить проект"""
     
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    project = result.scalar_one_or_none()
+    # Устанавливаем статус отменён вместо удаления
+    result = await db.execute(
+        update(Project).where(Project.id == project_id).values(status=ProjectStatus.CANCELLED)
+    )
     
-    if not project:
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Проект не найден")
     
-    # Устанавливаем статус отменён вместо удаления
-    project.status = ProjectStatus.CANCELLED
     await db.commit()
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    project_cache.invalidate()
     
     return {"message": "Проект удалён (отменён)"}
 
@@ -725,6 +1036,7 @@ async def delete_project(
 async def list_applications(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[ApplicationStatus] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
@@ -740,36 +1052,19 @@ async def list_applications(
         query = query.where(Application.status == status)
         count_query = count_query.where(Application.status == status)
     
-    total = await db.scalar(count_query) or 0
-    
-    sort_column = getattr(Application, sort_by, Application.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
-    
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
-    
-    result = await db.execute(query)
-    applications = result.scalars().all()
+    # Сортировка, пагинация и подсчёт
+    sort_column = _sort_column(APPLICATION_SORTABLE, sort_by)
+    applications, total = await _fetch_page(
+        db, query, count_query, Application, sort_column, sort_order, page, per_page, cursor
+    )
     
     return {
-        "items": [
-            ApplicationAdminResponse(
-                id=a.id,
-                project_id=a.project_id,
-                student_id=a.student_id,
-                cover_letter=a.cover_letter,
-                proposed_rate=a.proposed_rate,
-                status=a.status.value,
-                created_at=a.created_at,
-            ) for a in applications
-        ],
+        "items": APPLICATION_LIST_ADAPTER.validate_python(applications),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if per_page > 0 else 0,
+        "next_cursor": _next_cursor(applications, sort_column, per_page),
     }
 
 
@@ -782,19 +1077,27 @@ async def update_application(
 ):
     """Обновить заявку"""
     
-    result = await db.execute(select(Application).where(Application.id == application_id))
-    application = result.scalar_one_or_none()
+    update_data = data.model_dump(exclude_unset=True)
+    if update_data:
+        query = (
+            update(Application)
+            .where(Application.id == application_id)
+            .values(**update_data)
+            .returning(Application.id)
+        )
+    else:
+        query = select(Application.id).where(Application.id == application_id)
+    
+    updated_id = await db.scalar(query)
     
-    if not application:
+    if updated_id is None:
         raise HTTPException(status_code=404, detail="Заявка не найдена")
     
-    update_data = data.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(application, field, value)
-    
     await db.commit()
+    stats_cache.invalidate(STATS_CACHE_KEY)
+    application_cache.invalidate()
     
-    return {"message": "Заявка обновлена", "application_id": application.id}
+    return {"message": "Заявка обновлена", "application_id": updated_id}
 
 
 # ============= Договоры =============
@@ -803,6 +1106,7 @@ async def update_application(
 async def list_contracts(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     status: Optional[ContractStatus] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
@@ -818,38 +1122,19 @@ async def list_contracts(
         query = query.where(Contract.status == status)
         count_query = count_query.where(Contract.status == status)
     
-    total = await db.scalar(count_query) or 0
-    
-    sort_column = getattr(Contract, sort_by, Contract.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
-    
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
-    
-    result = await db.execute(query)
-    contracts = result.scalars().all()
+    # Сортировка, пагинация и подсчёт
+    sort_column = _sort_column(CONTRACT_SORTABLE, sort_by)
+    contracts, total = await _fetch_page(
+        db, query, count_query, Contract, sort_column, sort_order, page, per_page, cursor
+    )
     
     return {
-        "items": [
-            ContractAdminResponse(
-                id=c.id,
-                project_id=c.project_id,
-                customer_id=c.customer_id,
-                student_id=c.student_id,
-                total_amount=c.total_amount,
-                status=c.status.value,
-                signed_at=c.signed_at,
-                completed_at=c.completed_at,
-                created_at=c.created_at,
-            ) for c in contracts
-        ],
+        "items": CONTRACT_LIST_ADAPTER.validate_python(contracts),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if per_page > 0 else 0,
+        "next_cursor": _next_cursor(contracts, sort_column, per_page),
     }
 
 
@@ -859,6 +1144,7 @@ async def list_contracts(
 async def list_ratings(
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     sort_by: str = "created_at",
     sort_order: str = "desc",
     db: AsyncSession = Depends(get_db),
@@ -869,36 +1155,19 @@ async def list_ratings(
     query = select(Rating)
     count_query = select(func.count(Rating.id))
     
-    total = await db.scalar(count_query) or 0
-    
-    sort_column = getattr(Rating, sort_by, Rating.created_at)
-    if sort_order == "desc":
-        query = query.order_by(sort_column.desc())
-    else:
-        query = query.order_by(sort_column.asc())
-    
-    offset = (page - 1) * per_page
-    query = query.offset(offset).limit(per_page)
-    
-    result = await db.execute(query)
-    ratings = result.scalars().all()
+    # Сортировка, пагинация и подсчёт
+    sort_column = _sort_column(RATING_SORTABLE, sort_by)
+    ratings, total = await _fetch_page(
+        db, query, count_query, Rating, sort_column, sort_order, page, per_page, cursor
+    )
     
     return {
-        "items": [
-            RatingAdminResponse(
-                id=r.id,
-                project_id=r.project_id,
-                reviewer_id=r.reviewer_id,
-                reviewee_id=r.reviewee_id,
-                score=r.score,
-                comment=r.comment,
-                created_at=r.created_at,
-            ) for r in ratings
-        ],
+        "items": RATING_LIST_ADAPTER.validate_python(ratings),
         "total": total,
         "page": page,
         "per_page": per_page,
         "pages": (total + per_page - 1) // per_page if per_page > 0 else 0,
+        "next_cursor": _next_cursor(ratings, sort_column, per_page),
     }
 
 
@@ -910,14 +1179,33 @@ async def delete_rating(
 ):
     """Удалить рейтинг"""
     
-    result = await db.execute(select(Rating).where(Rating.id == rating_id))
-    rating = result.scalar_one_or_none()
+    result = await db.execute(
+        delete(Rating).where(Rating.id == rating_id).returning(Rating.reviewee_id, Rating.score)
+    )
+    rating = result.first()
     
     if not rating:
         raise HTTPException(status_code=404, detail="Рейтинг не найден")
     
-    await db.delete(rating)
+    # Убираем оценку из накопленных суммы и количества получателя
+    remaining = User.rating_count - 1
+    await db.execute(
+        update(User)
+        .where(User.id == rating.reviewee_id)
+        .values(
+            rating_sum=User.rating_sum - rating.score,
+            rating_count=remaining,
+            rating_score=case(
+                (remaining > 0, cast(User.rating_sum - rating.score, Float) / remaining),
+                else_=0.0,
+            ),
+        )
+    )
     await db.commit()
+    rating_cache.invalidate()
+    project_cache.invalidate()
+    student_cache.invalidate()
+    user_cache.invalidate(rating.reviewee_id)
     
     return {"message": "Рейтинг удалён"}
 
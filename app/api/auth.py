@@ -1,14 +1,14 @@
 """
 API endpoints для аутентификации
 """
-from datetime import timedelta
+import asyncio
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
 from app.core.database import get_db
 from app.core.security import verify_password, get_password_hash, create_access_token
 from app.models.user import User
@@ -26,26 +26,31 @@ async def register(
     """
     Регистрация нового пользователя
     """
-    # Проверяем, что email не занят
-    result = await db.execute(select(User).where(User.email == user_data.email))
-    if result.scalar_one_or_none():
+    # bcrypt считаем в потоке, не блокируя event loop
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
+    
+    # Создаём пользователя одним INSERT ... RETURNING: занятый email
+    # отсекает уникальный индекс, отдельный SELECT не нужен
+    user = await db.scalar(
+        pg_insert(User)
+        .values(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name,
+            role=user_data.role,
+        )
+        .on_conflict_do_nothing(index_elements=[User.email])
+        .returning(User)
+    )
+    
+    if user is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Пользователь с таким email уже существует"
         )
     
-    # Создаём пользователя
-    user = User(
-        email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
-        first_name=user_data.first_name,
-        last_name=user_data.last_name,
-        role=user_data.role,
-    )
-    
-    db.add(user)
     await db.commit()
-    await db.refresh(user)
     
     return user
 
@@ -62,7 +67,7 @@ async def login(
     result = await db.execute(select(User).where(User.email == form_data.username))
     user = result.scalar_one_or_none()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await asyncio.to_thread(verify_password, form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный email или пароль",
@@ -75,12 +80,8 @@ async def login(
             detail="Пользователь неактивен"
         )
     
-    # Создаём токен
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": str(user.id)},
-        expires_delta=access_token_expires
-    )
+    # Создаём токен (срок жизни по умолчанию — access_token_expire_minutes)
+    access_token = create_access_token(data={"sub": str(user.id)})
     
     return Token(access_token=access_token)
 
@@ -1,16 +1,17 @@
 """
 Зависимости для API endpoints
 """
-from typing import Optional
+from typing import Callable, Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import user_cache
 from app.core.database import get_db
 from app.core.security import decode_access_token
-from app.models.user import User
+from app.models.user import User, UserRole
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
@@ -37,8 +38,15 @@ async def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    result = await db.execute(select(User).where(User.id == int(user_id)))
-    user = result.scalar_one_or_none()
+    async def load():
+        user = await db.scalar(select(User).where(User.id == int(user_id)))
+        if user is not None:
+            # Из сессии убираем: объект переживёт запрос и не должен меняться
+            # ни при откате, ни при UPDATE ... RETURNING в чужой сессии
+            db.expunge(user)
+        return user
+    
+    user = await user_cache.get_or_set(int(user_id), load)
     
     if user is None:
         raise credentials_exception
@@ -61,14 +69,28 @@ async def get_current_active_user(
     return current_user
 
 
+def require_role(*roles: UserRole, detail: str = "Недостаточно прав") -> Callable:
+    """
+    Зависимость: текущий пользователь с одной из указанных ролей.
+    Запрос с неподходящей ролью отклоняется до кода endpoint'а
+    """
+    async def dependency(current_user: User = Depends(get_current_active_user)) -> User:
+        if current_user.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=detail
+            )
+        return current_user
+    
+    return dependency
+
+
 async def get_current_admin_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
     """
     Проверить что пользователь — администратор
     """
-    from app.models.user import UserRole
-    
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
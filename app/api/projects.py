@@ -1,23 +1,27 @@
 """
 API endpoints для проектов
 """
-import json
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy import select, func
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import select, insert, update, func, and_, bindparam, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from pydantic import BaseModel
+from sqlalchemy.orm import aliased, contains_eager, raiseload, selectinload
+from pydantic import BaseModel, TypeAdapter
 
+from app.core.cache import application_cache, project_cache
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, require_role
 from app.models.user import User, UserRole
 from app.models.project import Project, Task, Application, ProjectStatus, ApplicationStatus
 from app.schemas.project import (
     ProjectCreate, 
     ProjectUpdate, 
+    ProjectListResponse,
     ProjectResponse,
+    ProjectAssigneeInfo,
     TaskCreate,
     TaskResponse,
     TaskAssigneeInfo,
@@ -29,59 +33,81 @@ from app.schemas.project import (
 
 router = APIRouter()
 
+# Списки отдаются без задач (ProjectListResponse), поэтому грузим только исполнителя
+# и только поля ProjectAssigneeInfo (без bio, skills, хеша пароля).
+# Остальные связи запрещены: случайное обращение к ним
+# упадёт с ошибкой, а не отправит по запросу на каждую строку (N+1)
+PROJECT_LIST_OPTIONS = (
+    selectinload(Project.assignee).load_only(
+        *(getattr(User, field) for field in ProjectAssigneeInfo.model_fields)
+    ),
+    raiseload("*"),
+)
+
+# Исполнители проекта и задач — разные строки users, поэтому нужны псевдонимы
+_project_assignee = aliased(User)
+_task_assignee = aliased(User)
+
+# Проект со связями для ProjectResponse одним запросом: задач у проекта немного,
+# так что LEFT JOIN дешевле двух дополнительных selectinload-запросов.
+# Строк столько же, сколько задач, — результат читать через .unique().
+# Запрос собирается один раз при импорте, id передаётся параметром:
+# в обработчике не строится дерево выражения, а скомпилированный SQL берётся из кэша
+PROJECT_BY_ID = (
+    select(Project)
+    .outerjoin(Project.assignee.of_type(_project_assignee))
+    .outerjoin(Project.tasks)
+    .outerjoin(Task.assignee.of_type(_task_assignee))
+    .options(
+        contains_eager(Project.assignee.of_type(_project_assignee)),
+        contains_eager(Project.tasks).contains_eager(Task.assignee.of_type(_task_assignee)),
+    )
+    .where(Project.id == bindparam("project_id"))
+    .order_by(Task.order, Task.id)
+)
+
+# Списки сериализуем сами и отдаём готовым ORJSONResponse: FastAPI не валидирует
+# ответ повторно по response_model. В кэше тоже лежат уже сериализованные ответы
+PROJECT_LIST_ADAPTER = TypeAdapter(List[ProjectListResponse])
+APPLICATION_LIST_ADAPTER = TypeAdapter(List[ApplicationResponse])
+
 
 # ===== ПРОЕКТЫ =====
 
 @router.post("/", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(
+        require_role(UserRole.CUSTOMER, detail="Только заказчики могут создавать проекты")
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Создать новый проект (только для заказчиков)
     """
-    if current_user.role != UserRole.CUSTOMER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только заказчики могут создавать проекты"
-        )
-    
-    # Преобразуем tech_stack в JSON строку
-    tech_stack = None
-    if project_data.tech_stack:
-        tech_stack = json.dumps(project_data.tech_stack)
-    
     project = Project(
         title=project_data.title,
         description=project_data.description,
         requirements=project_data.requirements,
         budget=project_data.budget,
         deadline=project_data.deadline,
-        tech_stack=tech_stack,
+        tech_stack=project_data.tech_stack or None,
         llm_estimation=project_data.llm_estimation,
         customer_id=current_user.id,
         status=ProjectStatus.DRAFT,
+        # У нового проекта нет ни исполнителя, ни задач — связи считаются загруженными
+        assignee=None,
+        tasks=[],
     )
     
     db.add(project)
     await db.commit()
-    
-    # Загружаем проект с tasks для корректного ответа
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project.id)
-    )
-    project = result.scalar_one()
+    project_cache.invalidate()
     
     return project
 
 
-@router.get("/", response_model=List[ProjectResponse])
+@router.get("/", response_model=List[ProjectListResponse])
 async def list_projects(
     status: Optional[ProjectStatus] = None,
     skip: int = 0,
@@ -91,10 +117,7 @@ async def list_projects(
     """
     Получить список проектов
     """
-    query = select(Project).options(
-        selectinload(Project.assignee),
-        selectinload(Project.tasks).selectinload(Task.assignee)
-    )
+    query = select(Project).options(*PROJECT_LIST_OPTIONS)
     
     if status:
         query = query.where(Project.status == status)
@@ -104,11 +127,15 @@ async def list_projects(
     
     query = query.order_by(Project.created_at.desc()).offset(skip).limit(limit)
     
-    result = await db.execute(query)
-    return result.scalars().all()
+    async def load():
+        result = await db.execute(query)
+        items = PROJECT_LIST_ADAPTER.validate_python(result.scalars().all())
+        return PROJECT_LIST_ADAPTER.dump_python(items, mode="json")
+    
+    return ORJSONResponse(await project_cache.get_or_set(("projects", status, skip, limit), load))
 
 
-@router.get("/my", response_model=List[ProjectResponse])
+@router.get("/my", response_model=List[ProjectListResponse])
 async def list_my_projects(
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db)
@@ -120,34 +147,27 @@ async def list_my_projects(
         # Для заказчика — его проекты
         result = await db.execute(
             select(Project)
-            .options(
-                selectinload(Project.assignee),
-                selectinload(Project.tasks).selectinload(Task.assignee)
-            )
+            .options(*PROJECT_LIST_OPTIONS)
             .where(Project.customer_id == current_user.id)
             .order_by(Project.created_at.desc())
         )
     else:
-        # Для студента — проекты, на которые он подал заявку ИЛИ где он назначен исполнителем
-        from sqlalchemy import or_
+        # Для студента — проекты, на которые он подал заявку ИЛИ где он назначен исполнителем.
+        # Id собираем UNION ALL двух выборок по индексам; повторы не мешают IN,
+        # так что DISTINCT по всему соединению не нужен
+        project_ids = union_all(
+            select(Project.id).where(Project.assignee_id == current_user.id),
+            select(Application.project_id).where(Application.student_id == current_user.id),
+        )
         result = await db.execute(
             select(Project)
-            .options(
-                selectinload(Project.assignee),
-                selectinload(Project.tasks).selectinload(Task.assignee)
-            )
-            .outerjoin(Application, Project.id == Application.project_id)
-            .where(
-                or_(
-                    Application.student_id == current_user.id,
-                    Project.assignee_id == current_user.id
-                )
-            )
-            .distinct()
+            .options(*PROJECT_LIST_OPTIONS)
+            .where(Project.id.in_(project_ids))
             .order_by(Project.created_at.desc())
         )
     
-    return result.scalars().all()
+    items = PROJECT_LIST_ADAPTER.validate_python(result.scalars().all())
+    return ORJSONResponse(PROJECT_LIST_ADAPTER.dump_python(items, mode="json"))
 
 
 @router.get("/{project_id}", response_model=ProjectResponse)
@@ -158,23 +178,19 @@ async def get_project(
     """
     Получить проект по ID
     """
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
-    
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Проект не найден"
-        )
+    async def load():
+        result = await db.execute(PROJECT_BY_ID, {"project_id": project_id})
+        project = result.unique().scalar_one_or_none()
+        
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Проект не найден"
+            )
+        
+        return ProjectResponse.model_validate(project).model_dump(mode="json")
     
-    return project
+    return ORJSONResponse(await project_cache.get_or_set(("project", project_id), load))
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
@@ -187,10 +203,8 @@ async def update_project(
     """
     Обновить проект (только владелец)
     """
-    result = await db.execute(
-        select(Project).where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
+    result = await db.execute(PROJECT_BY_ID, {"project_id": project_id})
+    project = result.unique().scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -206,24 +220,11 @@ async def update_project(
     
     update_data = project_data.model_dump(exclude_unset=True)
     
-    if "tech_stack" in update_data and update_data["tech_stack"]:
-        update_data["tech_stack"] = json.dumps(update_data["tech_stack"])
-    
     for field, value in update_data.items():
         setattr(project, field, value)
     
     await db.commit()
-    
-    # Загружаем проект с tasks для корректного ответа
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project_id)
-    )
-    project = result.scalar_one()
+    project_cache.invalidate()
     
     return project
 
@@ -237,10 +238,8 @@ async def publish_project(
     """
     Опубликовать проект (перевести в статус OPEN)
     """
-    result = await db.execute(
-        select(Project).where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
+    result = await db.execute(PROJECT_BY_ID, {"project_id": project_id})
+    project = result.unique().scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -262,17 +261,7 @@ async def publish_project(
     
     project.status = ProjectStatus.OPEN
     await db.commit()
-    
-    # Загружаем проект с tasks для корректного ответа
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project_id)
-    )
-    project = result.scalar_one()
+    project_cache.invalidate()
     
     return project
 
@@ -287,10 +276,8 @@ async def complete_project(
     Завершить проект (перевести в статус COMPLETED)
     Только заказчик может завершить проект
     """
-    result = await db.execute(
-        select(Project).where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
+    result = await db.execute(PROJECT_BY_ID, {"project_id": project_id})
+    project = result.unique().scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -318,16 +305,7 @@ async def complete_project(
     
     project.status = ProjectStatus.COMPLETED
     await db.commit()
-    
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project_id)
-    )
-    project = result.scalar_one()
+    project_cache.invalidate()
     
     return project
 
@@ -342,10 +320,8 @@ async def request_review(
     Запросить проверку проекта (перевести в статус REVIEW)
     Исполнитель может запросить проверку, чтобы заказчик проверил работу
     """
-    result = await db.execute(
-        select(Project).where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
+    result = await db.execute(PROJECT_BY_ID, {"project_id": project_id})
+    project = result.unique().scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -367,16 +343,7 @@ async def request_review(
     
     project.status = ProjectStatus.REVIEW
     await db.commit()
-    
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project_id)
-    )
-    project = result.scalar_one()
+    project_cache.invalidate()
     
     return project
 
@@ -387,58 +354,53 @@ async def request_review(
 async def apply_for_project(
     project_id: int,
     application_data: ApplicationCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(
+        require_role(UserRole.STUDENT, detail="Только студенты могут подавать заявки")
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Подать заявку на проект (только для студентов)
     """
-    if current_user.role != UserRole.STUDENT:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только студенты могут подавать заявки"
-        )
-    
-    # Проверяем проект
     result = await db.execute(
-        select(Project).where(Project.id == project_id)
+        select(Project.status).where(Project.id == project_id)
     )
-    project = result.scalar_one_or_none()
+    project_status = result.scalar_one_or_none()
     
-    if not project:
+    if project_status is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Проект не найден"
         )
     
-    if project.status != ProjectStatus.OPEN:
+    if project_status != ProjectStatus.OPEN:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Проект не открыт для заявок"
         )
     
-    # Проверяем, нет ли уже заявки от этого студента
-    existing = await db.execute(
-        select(Application)
-        .where(Application.project_id == project_id)
-        .where(Application.student_id == current_user.id)
+    # Повторную заявку отсекает уникальный индекс (project_id, student_id):
+    # ON CONFLICT DO NOTHING ничего не вернёт, гонки между SELECT и INSERT нет
+    application = await db.scalar(
+        pg_insert(Application)
+        .values(
+            project_id=project_id,
+            student_id=current_user.id,
+            cover_letter=application_data.cover_letter,
+            proposed_rate=application_data.proposed_rate,
+        )
+        .on_conflict_do_nothing(index_elements=[Application.project_id, Application.student_id])
+        .returning(Application)
     )
-    if existing.scalar_one_or_none():
+    
+    if application is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Вы уже подали заявку на этот проект"
         )
     
-    application = Application(
-        project_id=project_id,
-        student_id=current_user.id,
-        cover_letter=application_data.cover_letter,
-        proposed_rate=application_data.proposed_rate,
-    )
-    
-    db.add(application)
     await db.commit()
-    await db.refresh(application)
+    application_cache.invalidate(("applications", current_user.id))
     
     return application
 
@@ -452,31 +414,32 @@ async def list_project_applications(
     """
     Получить заявки на проект (только владелец проекта)
     """
-    # Проверяем проект
+    # Владелец проекта и заявки — одним запросом; у проекта без заявок
+    # будет одна строка с application = None
     result = await db.execute(
-        select(Project).where(Project.id == project_id)
+        select(Project.customer_id, Application)
+        .outerjoin(Application, Application.project_id == Project.id)
+        .options(raiseload("*"))
+        .where(Project.id == project_id)
+        .order_by(Application.created_at.desc())
     )
-    project = result.scalar_one_or_none()
+    rows = result.all()
     
-    if not project:
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Проект не найден"
         )
     
-    if project.customer_id != current_user.id:
+    if rows[0].customer_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Нет доступа к заявкам этого проекта"
         )
     
-    result = await db.execute(
-        select(Application)
-        .where(Application.project_id == project_id)
-        .order_by(Application.created_at.desc())
-    )
-    
-    return result.scalars().all()
+    applications = [application for _, application in rows if application is not None]
+    items = APPLICATION_LIST_ADAPTER.validate_python(applications)
+    return ORJSONResponse(APPLICATION_LIST_ADAPTER.dump_python(items, mode="json"))
 
 
 @router.put("/{project_id}/applications/{application_id}", response_model=ApplicationResponse)
@@ -490,26 +453,23 @@ async def update_application_status(
     """
     Обновить статус заявки (принять/отклонить)
     """
-    # Проверяем проект
+    # Владелец проекта и заявка одним запросом; весь проект для проверки не нужен
     result = await db.execute(
-        select(Project).where(Project.id == project_id)
+        select(Project.customer_id, Application)
+        .outerjoin(
+            Application,
+            and_(Application.id == application_id, Application.project_id == Project.id)
+        )
+        .where(Project.id == project_id)
     )
-    project = result.scalar_one_or_none()
+    customer_id, application = result.first() or (None, None)
     
-    if not project or project.customer_id != current_user.id:
+    if customer_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Нет доступа"
         )
     
-    # Получаем заявку
-    result = await db.execute(
-        select(Application)
-        .where(Application.id == application_id)
-        .where(Application.project_id == project_id)
-    )
-    application = result.scalar_one_or_none()
-    
     if not application:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -520,10 +480,15 @@ async def update_application_status(
     
     # Если заявка принята, переводим проект в статус IN_PROGRESS
     if status_data.status == ApplicationStatus.ACCEPTED:
-        project.status = ProjectStatus.IN_PROGRESS
+        await db.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(status=ProjectStatus.IN_PROGRESS)
+        )
     
     await db.commit()
-    await db.refresh(application)
+    project_cache.invalidate()
+    application_cache.invalidate(("applications", application.student_id))
     
     return application
 
@@ -546,32 +511,30 @@ async def assign_task_assignee(
     """
     Назначить исполнителя задаче (только владелец проекта)
     """
-    # Проверяем проект
+    # Владелец проекта, задача и новый исполнитель одним запросом вместо трёх
+    # последовательных: все три ищутся по id из запроса и друг от друга не зависят
     result = await db.execute(
-        select(Project).where(Project.id == project_id)
+        select(Project.customer_id, Task, _task_assignee)
+        .outerjoin(Task, and_(Task.id == task_id, Task.project_id == Project.id))
+        .outerjoin(_task_assignee, _task_assignee.id == assignee_data.assignee_id)
+        .where(Project.id == project_id)
     )
-    project = result.scalar_one_or_none()
+    row = result.first()
     
-    if not project:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Проект не найден"
         )
     
-    if project.customer_id != current_user.id:
+    customer_id, task, assignee = row
+    
+    if customer_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Только владелец проекта может назначать исполнителей"
         )
     
-    # Получаем задачу
-    result = await db.execute(
-        select(Task)
-        .where(Task.id == task_id)
-        .where(Task.project_id == project_id)
-    )
-    task = result.scalar_one_or_none()
-    
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -580,11 +543,6 @@ async def assign_task_assignee(
     
     # Если указан assignee_id, проверяем что это студент
     if assignee_data.assignee_id:
-        result = await db.execute(
-            select(User).where(User.id == assignee_data.assignee_id)
-        )
-        assignee = result.scalar_one_or_none()
-        
         if not assignee:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -597,20 +555,14 @@ async def assign_task_assignee(
                 detail="Исполнителем может быть только студент"
             )
         
-        task.assignee_id = assignee_data.assignee_id
+        # Присваиваем объект, а не id: связь для ответа уже загружена, перечитывать задачу не нужно
+        task.assignee = assignee
     else:
         # Убираем исполнителя
-        task.assignee_id = None
+        task.assignee = None
     
     await db.commit()
-    
-    # Загружаем задачу с assignee для корректного ответа
-    result = await db.execute(
-        select(Task)
-        .options(selectinload(Task.assignee))
-        .where(Task.id == task_id)
-    )
-    task = result.scalar_one()
+    project_cache.invalidate()
     
     return task
 
@@ -632,11 +584,9 @@ async def assign_project_assignee(
     """
     Назначить исполнителя проекту (только владелец проекта)
     """
-    # Проверяем проект
-    result = await db.execute(
-        select(Project).where(Project.id == project_id)
-    )
-    project = result.scalar_one_or_none()
+    # Проверяем проект (сразу со связями для ответа)
+    result = await db.execute(PROJECT_BY_ID, {"project_id": project_id})
+    project = result.unique().scalar_one_or_none()
     
     if not project:
         raise HTTPException(
@@ -669,51 +619,42 @@ async def assign_project_assignee(
                 detail="Исполнителем может быть только студент"
             )
         
-        project.assignee_id = assignee_data.assignee_id
+        # Присваиваем объект, а не id, чтобы загруженная связь осталась актуальной
+        project.assignee = assignee
         # Переводим проект в статус IN_PROGRESS при назначении исполнителя
         if project.status == ProjectStatus.OPEN:
             project.status = ProjectStatus.IN_PROGRESS
     else:
         # Убираем исполнителя
-        project.assignee_id = None
+        project.assignee = None
     
     await db.commit()
-    
-    # Загружаем проект с assignee для корректного ответа
-    result = await db.execute(
-        select(Project)
-        .options(
-            selectinload(Project.assignee),
-            selectinload(Project.tasks).selectinload(Task.assignee)
-        )
-        .where(Project.id == project_id)
-    )
-    project = result.scalar_one()
+    project_cache.invalidate()
     
     return project
 
 
 @router.get("/applications/my", response_model=List[ApplicationResponse])
 async def get_my_applications(
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(
+        require_role(UserRole.STUDENT, detail="Только студенты могут просматривать свои заявки")
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Получить заявки текущего студента
     """
-    if current_user.role != UserRole.STUDENT:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только студенты могут просматривать свои заявки"
+    async def load():
+        result = await db.execute(
+            select(Application)
+            .options(raiseload("*"))
+            .where(Application.student_id == current_user.id)
+            .order_by(Application.created_at.desc())
         )
+        items = APPLICATION_LIST_ADAPTER.validate_python(result.scalars().all())
+        return APPLICATION_LIST_ADAPTER.dump_python(items, mode="json")
     
-    result = await db.execute(
-        select(Application)
-        .where(Application.student_id == current_user.id)
-        .order_by(Application.created_at.desc())
-    )
-    
-    return result.scalars().all()
+    return ORJSONResponse(await application_cache.get_or_set(("applications", current_user.id), load))
 
 
 @router.post("/{project_id}/tasks", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -726,48 +667,47 @@ async def create_task(
     """
     Создать задачу в проекте (только владелец проекта)
     """
+    # Блокируем строку проекта до конца транзакции: параллельные create_task
+    # одного проекта идут по очереди и не получат одинаковый order
     result = await db.execute(
-        select(Project).where(Project.id == project_id)
+        select(Project.customer_id).where(Project.id == project_id).with_for_update()
     )
-    project = result.scalar_one_or_none()
+    customer_id = result.scalar_one_or_none()
     
-    if not project:
+    if customer_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Проект не найден"
         )
     
-    if project.customer_id != current_user.id:
+    if customer_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Только владелец проекта может создавать задачи"
         )
     
-    max_order = await db.execute(
-        select(func.max(Task.order)).where(Task.project_id == project_id)
-    )
-    next_order = (max_order.scalar() or 0) + 1
-    
-    task = Task(
-        project_id=project_id,
-        title=task_data.title,
-        description=task_data.description,
-        complexity=task_data.complexity,
-        estimated_hours=task_data.estimated_hours,
-        deadline=task_data.deadline,
-        order=next_order,
+    # Следующий порядковый номер считается внутри того же INSERT
+    next_order = (
+        select(func.coalesce(func.max(Task.order), 0) + 1)
+        .where(Task.project_id == project_id)
+        .scalar_subquery()
     )
     
-    db.add(task)
-    await db.commit()
-    await db.refresh(task)
-    
-    result = await db.execute(
-        select(Task)
-        .options(selectinload(Task.assignee))
-        .where(Task.id == task.id)
+    task = await db.scalar(
+        insert(Task)
+        .values(
+            project_id=project_id,
+            title=task_data.title,
+            description=task_data.description,
+            complexity=task_data.complexity,
+            estimated_hours=task_data.estimated_hours,
+            deadline=task_data.deadline,
+            order=next_order,
+        )
+        .returning(Task)
     )
-    task = result.scalar_one()
+    await db.commit()
+    project_cache.invalidate()
     
     return task
 
@@ -4,12 +4,16 @@ API endpoints для рейтингов
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
-from sqlalchemy import select, func
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, Field, TypeAdapter
+from sqlalchemy import select, update, cast, Float
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from app.core.cache import project_cache, rating_cache, student_cache, user_cache
 from app.core.database import get_db
-from app.api.deps import get_current_active_user
+from app.api.deps import require_role
 from app.models.user import User, UserRole
 from app.models.project import Project, ProjectStatus
 from app.models.rating import Rating
@@ -45,19 +49,30 @@ class RatingResponse(BaseModel):
         from_attributes = True
 
 
+RATING_LIST_ADAPTER = TypeAdapter(List[RatingResponse])
+
+
 @router.post("/", response_model=RatingResponse, status_code=status.HTTP_201_CREATED)
 async def create_rating(
     rating_data: RatingCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: User = Depends(
+        require_role(
+            UserRole.CUSTOMER,
+            UserRole.STUDENT,
+            detail="Только заказчики и студенты могут оставлять отзывы",
+        )
+    ),
     db: AsyncSession = Depends(get_db)
 ):
     """
     Создать рейтинг/отзыв (заказчик -> студент или студент -> заказчик после завершения проекта)
     """
+    # Для проверок нужны только статус и участники, а не вся строка проекта
     result = await db.execute(
-        select(Project).where(Project.id == rating_data.project_id)
+        select(Project.status, Project.customer_id, Project.assignee_id)
+        .where(Project.id == rating_data.project_id)
     )
-    project = result.scalar_one_or_none()
+    project = result.one_or_none()
     
     if not project:
         raise HTTPException(
@@ -82,7 +97,7 @@ async def create_rating(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Неверный исполнитель"
             )
-    elif current_user.role == UserRole.STUDENT:
+    else:
         if project.assignee_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -93,53 +108,49 @@ async def create_rating(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Неверный заказчик"
             )
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Только заказчики и студенты могут оставлять отзывы"
-        )
     
-    existing = await db.execute(
-        select(Rating)
-        .where(Rating.project_id == rating_data.project_id)
-        .where(Rating.reviewer_id == current_user.id)
+    # Повторный отзыв отсекает уникальный индекс (project_id, reviewer_id)
+    rating = await db.scalar(
+        pg_insert(Rating)
+        .values(
+            project_id=rating_data.project_id,
+            reviewer_id=current_user.id,
+            reviewee_id=rating_data.reviewee_id,
+            score=rating_data.score,
+            comment=rating_data.comment,
+            quality_score=rating_data.quality_score,
+            communication_score=rating_data.communication_score,
+            deadline_score=rating_data.deadline_score,
+        )
+        .on_conflict_do_nothing(index_elements=[Rating.project_id, Rating.reviewer_id])
+        .returning(Rating)
     )
-    if existing.scalar_one_or_none():
+    
+    if rating is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Вы уже оставили отзыв на этот проект"
         )
     
-    rating = Rating(
-        project_id=rating_data.project_id,
-        reviewer_id=current_user.id,
-        reviewee_id=rating_data.reviewee_id,
-        score=rating_data.score,
-        comment=rating_data.comment,
-        quality_score=rating_data.quality_score,
-        communication_score=rating_data.communication_score,
-        deadline_score=rating_data.deadline_score,
-    )
-    
-    db.add(rating)
+    # Средняя оценка пересчитывается из накопленных суммы и количества одним UPDATE
+    values = {
+        "rating_sum": User.rating_sum + rating.score,
+        "rating_count": User.rating_count + 1,
+        "rating_score": cast(User.rating_sum + rating.score, Float) / (User.rating_count + 1),
+    }
+    if current_user.role == UserRole.CUSTOMER:
+        values["completed_projects"] = User.completed_projects + 1
     
-    reviewee_result = await db.execute(
-        select(User).where(User.id == rating_data.reviewee_id)
+    await db.execute(
+        update(User).where(User.id == rating_data.reviewee_id).values(**values)
     )
-    reviewee = reviewee_result.scalar_one_or_none()
-    
-    if reviewee:
-        avg_result = await db.execute(
-            select(func.avg(Rating.score))
-            .where(Rating.reviewee_id == reviewee.id)
-        )
-        avg_score = avg_result.scalar() or 0
-        reviewee.rating_score = float(avg_score)
-        if current_user.role == UserRole.CUSTOMER:
-            reviewee.completed_projects += 1
     
     await db.commit()
-    await db.refresh(rating)
+    rating_cache.invalidate()
+    # В ответах проектов и списках студентов есть rating_score исполнителя
+    project_cache.invalidate()
+    student_cache.invalidate()
+    user_cache.invalidate(rating_data.reviewee_id)
     
     return rating
 
@@ -154,14 +165,18 @@ async def get_user_ratings(
     """
     Получить отзывы о пользователе
     """
-    result = await db.execute(
-        select(Rating)
-        .where(Rating.reviewee_id == user_id)
-        .order_by(Rating.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-    )
+    async def load():
+        result = await db.execute(
+            select(Rating)
+            .options(raiseload("*"))
+            .where(Rating.reviewee_id == user_id)
+            .order_by(Rating.created_at.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        items = RATING_LIST_ADAPTER.validate_python(result.scalars().all())
+        return RATING_LIST_ADAPTER.dump_python(items, mode="json")
     
-    return result.scalars().all()
+    return ORJSONResponse(await rating_cache.get_or_set(("ratings", user_id, skip, limit), load))
 
 
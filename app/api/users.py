@@ -4,9 +4,13 @@ API endpoints для пользователей
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+from sqlalchemy import select, update, bindparam
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import raiseload
 
+from app.core.cache import project_cache, student_cache, user_cache
 from app.core.database import get_db
 from app.api.deps import get_current_active_user
 from app.models.user import User, UserRole
@@ -15,6 +19,35 @@ from app.schemas.user import UserResponse, UserUpdate
 
 router = APIRouter()
 
+# Списки сериализуем сами: ORJSONResponse отдаётся без повторной валидации по response_model
+USER_LIST_ADAPTER = TypeAdapter(List[UserResponse])
+
+# Запросы собираются один раз при импорте, значения передаются параметрами:
+# в обработчике не строится дерево выражения, а скомпилированный SQL берётся из кэша
+USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# Активные студенты по убыванию рейтинга (частичный индекс ix_users_student_rating)
+STUDENTS_BY_RATING = (
+    select(User)
+    .options(raiseload("*"))
+    .where(User.role == UserRole.STUDENT)
+    .where(User.is_active == True)
+    .order_by(User.rating_score.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+
+
+async def _students_response(db: AsyncSession, skip: int, limit: int) -> Response:
+    """Студенты по рейтингу; в кэше хранится уже сериализованный JSON"""
+    async def load():
+        result = await db.execute(STUDENTS_BY_RATING, {"skip": skip, "limit": limit})
+        items = USER_LIST_ADAPTER.validate_python(result.scalars().all())
+        return USER_LIST_ADAPTER.dump_json(items)
+    
+    content = await student_cache.get_or_set((skip, limit), load)
+    return Response(content, media_type="application/json")
+
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_profile(
@@ -36,37 +69,21 @@ async def update_current_user_profile(
     Обновить профиль текущего пользователя
     """
     update_data = user_data.model_dump(exclude_unset=True)
+    if not update_data:
+        return current_user
     
-    # Преобразуем skills в JSON строку если передано
-    if "skills" in update_data and update_data["skills"]:
-        import json
-        update_data["skills"] = json.dumps(update_data["skills"])
-    
-    for field, value in update_data.items():
-        setattr(current_user, field, value)
-    
+    # Одним UPDATE ... RETURNING: строка возвращается уже обновлённой
+    user = await db.scalar(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(**update_data)
+        .returning(User)
+    )
     await db.commit()
-    await db.refresh(current_user)
-    
-    return current_user
-
-
-@router.get("/{user_id}", response_model=UserResponse)
-async def get_user_profile(
-    user_id: int,
-    db: AsyncSession = Depends(get_db)
-):
-    """
-    Получить публичный профиль пользователя
-    """
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
+    # Профиль исполнителя встроен в ответы проектов и списки студентов
+    project_cache.invalidate()
+    student_cache.invalidate()
+    user_cache.invalidate(current_user.id)
     
     return user
 
@@ -80,16 +97,7 @@ async def list_students(
     """
     Получить список студентов (для заказчиков)
     """
-    result = await db.execute(
-        select(User)
-        .where(User.role == UserRole.STUDENT)
-        .where(User.is_active == True)
-        .order_by(User.rating_score.desc())
-        .offset(skip)
-        .limit(limit)
-    )
-    
-    return result.scalars().all()
+    return await _students_response(db, skip, limit)
 
 
 @router.get("/leaderboard", response_model=List[UserResponse])
@@ -100,14 +108,26 @@ async def get_leaderboard(
     """
     Получить топ студентов по рейтингу
     """
-    result = await db.execute(
-        select(User)
-        .where(User.role == UserRole.STUDENT)
-        .where(User.is_active == True)
-        .order_by(User.rating_score.desc())
-        .limit(limit)
-    )
-    
-    return result.scalars().all()
+    # Та же выборка, что у первой страницы списка студентов, и тот же ключ кэша
+    return await _students_response(db, 0, limit)
 
 
+# Маршрут с параметром объявлен последним, иначе он перехватит /leaderboard
+@router.get("/{user_id}", response_model=UserResponse)
+async def get_user_profile(
+    user_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Получить публичный профиль пользователя
+    """
+    result = await db.execute(USER_BY_ID, {"user_id": user_id})
+    user = result.scalar_one_or_none()
+    
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Пользователь не найден"
+        )
+    
+    return user
@@ -0,0 +1,85 @@
+"""
+In-process кэш с TTL для редко меняющихся данных
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from app.core.config import settings
+
+
+class TTLCache:
+    """
+    Кэш значений с временем жизни.
+    
+    get_or_set пересчитывает значение не более одного раза на ключ:
+    одновременные запросы ждут первый вместо повторных обращений к БД.
+    При заданном maxsize сначала вытесняются просроченные, затем самые старые записи.
+    """
+    
+    def __init__(self, ttl: float, maxsize: Optional[int] = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data: dict[Hashable, tuple[float, Any]] = {}
+        self._locks: dict[Hashable, asyncio.Lock] = {}
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._data.pop(key, None)
+            return None
+        return value
+    
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        if self.maxsize and key not in self._data and len(self._data) >= self.maxsize:
+            self._evict(now)
+        self._data[key] = (now + self.ttl, value)
+    
+    def _evict(self, now: float) -> None:
+        for key in [k for k, (expires_at, _) in self._data.items() if expires_at < now]:
+            del self._data[key]
+        # Записи добавляются по порядку, поэтому первая — самая старая
+        while len(self._data) >= self.maxsize:
+            del self._data[next(iter(self._data))]
+    
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Удалить ключ (или весь кэш, если ключ не указан)"""
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+    
+    async def get_or_set(self, key: Hashable, factory: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            return value
+        
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            value = self.get(key)
+            if value is None:
+                value = await factory()
+                self.set(key, value)
+        if not lock.locked():
+            self._locks.pop(key, None)
+        return value
+
+
+# Кэши ответов публичного API: короткий TTL, сброс целиком при изменениях.
+# Кэш у каждого процесса свой, поэтому изменения из других процессов
+# (и из SQLAdmin) видны не позже чем через api_cache_ttl секунд
+project_cache = TTLCache(ttl=settings.api_cache_ttl, maxsize=settings.api_cache_size)
+application_cache = TTLCache(ttl=settings.api_cache_ttl, maxsize=settings.api_cache_size)
+rating_cache = TTLCache(ttl=settings.api_cache_ttl, maxsize=settings.api_cache_size)
+
+# Список студентов и лидерборд: готовые JSON-байты, ключ — (skip, limit).
+# Ключей немного: лидерборд почти всегда запрашивают с одним и тем же limit
+student_cache = TTLCache(ttl=settings.student_cache_ttl, maxsize=16)
+
+# Текущий пользователь по id: без SELECT на каждый авторизованный запрос.
+# Объекты отсоединены от сессии и только читаются
+user_cache = TTLCache(ttl=settings.user_cache_ttl, maxsize=settings.user_cache_size)
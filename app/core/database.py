@@ -1,64 +1,134 @@
 """
 Настройка подключения к базе данных
 """
-from sqlalchemy import create_engine
+import logging
+from uuid import uuid4
+
+from sqlalchemy import DateTime
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
 
-# Создаём асинхронный движок (для API)
+# Настройки пула; у SQLite (aiosqlite) свой пул без этих параметров.
+# За PgBouncer соединения пулит он сам, а приложение держит их только на время запроса
+engine_options = {}
+if settings.db_pgbouncer:
+    engine_options = {"poolclass": NullPool}
+elif not settings.database_url.startswith("sqlite"):
+    engine_options = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": True,
+    }
+
+# Параметры драйвера asyncpg: таймаут запроса и без JIT на коротких OLTP-запросах
+if settings.database_url.startswith("postgresql+asyncpg"):
+    connect_args = {
+        "command_timeout": settings.db_command_timeout,
+        "server_settings": {"jit": "off"},
+    }
+    if settings.db_pgbouncer:
+        # PgBouncer отдаёт транзакции разным серверным соединениям, и подготовленный
+        # на одном из них запрос не найдётся на другом: кэши выключаем, имена делаем уникальными
+        connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    else:
+        # Каждый шаблон запроса разбирается и планируется сервером один раз на соединение
+        connect_args.update(
+            statement_cache_size=settings.db_statement_cache_size,
+            prepared_statement_cache_size=settings.db_statement_cache_size,
+        )
+    engine_options["connect_args"] = connect_args
+
+# Асинхронный движок (для API и SQLAdmin)
 async_engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
+    query_cache_size=settings.db_query_cache_size,
+    **engine_options,
 )
 
-# Синхронный движок (для SQLAdmin)
-# Преобразуем async URL в sync URL
-if "+asyncpg" in settings.database_url:
-    # PostgreSQL: postgresql+asyncpg -> postgresql+psycopg2
-    sync_database_url = settings.database_url.replace("+asyncpg", "+psycopg2")
-elif "+aiosqlite" in settings.database_url:
-    # SQLite: sqlite+aiosqlite -> sqlite
-    sync_database_url = settings.database_url.replace("+aiosqlite", "")
-else:
-    # Если уже синхронный URL, используем как есть
-    sync_database_url = settings.database_url
-
-engine = create_engine(
-    sync_database_url,
-    echo=settings.debug,
-)
-
-# Фабрика сессий (асинхронная)
+# Фабрика сессий (асинхронная).
+# autoflush выключен: обработчики меняют объекты уже после всех запросов,
+# и сброс изменений перед каждым execute() был бы лишней работой
 async_session_maker = async_sessionmaker(
     async_engine,
     class_=AsyncSession,
     expire_on_commit=False,
+    autoflush=False,
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 class Base(DeclarativeBase):
     """Базовый класс для всех моделей"""
     pass
 
 
+class utcnow(FunctionElement):
+    """
+    Текущее время UTC на стороне БД — для server_default колонок DateTime без часового пояса.
+    now() в PostgreSQL зависит от часового пояса сессии, поэтому переводим явно
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow, "postgresql")
+def _pg_utcnow(element, compiler, **kw):
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+@compiles(utcnow, "sqlite")
+def _sqlite_utcnow(element, compiler, **kw):
+    # SQLite хранит DateTime строкой; формат как у SQLAlchemy (с микросекундами),
+    # иначе сравнение строк в keyset-пагинации по created_at ломается
+    return "STRFTIME('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+@compiles(utcnow)
+def _default_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
 async def get_db() -> AsyncSession:
     """
-    Dependency для получения сессии базы данных
+    Dependency для получения сессии базы данных.
+    FastAPI кэширует зависимость в пределах запроса, так что все вложенные
+    зависимости получают одну и ту же сессию; закрывает её async with
     """
     async with async_session_maker() as session:
-        try:
-            yield session
-        finally:
-            await session.close()
+        yield session
 
 
 async def init_db():
     """
-    Инициализация базы данных (создание таблиц)
+    Инициализация базы данных (создание таблиц).
+    create_all проверяет каждую таблицу отдельным запросом, и так в каждом воркере:
+    при DB_CREATE_TABLES=false старт обходится без обращений к схеме
     """
+    # Без supports_statement_cache SQLAlchemy молча компилирует каждый запрос заново
+    dialect = async_engine.dialect
+    if dialect.supports_statement_cache:
+        logger.info("SQL statement cache enabled for %s (size %d)", dialect.name, settings.db_query_cache_size)
+    else:
+        logger.warning("SQL statement cache is not supported by dialect %s", dialect.name)
+    
+    if not settings.db_create_tables:
+        return
+    
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
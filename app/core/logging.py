@@ -0,0 +1,40 @@
+"""
+Настройка логирования: запись логов вынесена в фоновый поток
+"""
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+
+def setup_logging() -> QueueListener:
+    """
+    Направить логи приложения через очередь.
+    
+    Обработчики event loop только кладут запись в очередь,
+    форматирование и вывод выполняет поток QueueListener.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s")
+    )
+    
+    root = logging.getLogger()
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(logging.DEBUG if settings.debug else logging.INFO)
+    
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def shutdown_logging(listener: QueueListener) -> None:
+    """Дописать оставшиеся записи и отключить обработчик очереди"""
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
@@ -1,15 +1,33 @@
 """
 Модуль безопасности: хеширование паролей и JWT токены
 """
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 
 import bcrypt
-from jose import JWTError, jwt
+import jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 
+# Параметры JWT читаются из настроек один раз.
+# exp и sub обязательны: токен без них отклоняется при первом же разборе
+_JWT_SECRET = settings.secret_key
+_JWT_ALGORITHM = settings.algorithm
+_JWT_ALGORITHMS = [settings.algorithm]
+_JWT_EXPIRE = timedelta(minutes=settings.access_token_expire_minutes)
+_JWT_DECODE_OPTIONS = {"require": ["exp", "sub"]}
+
+# Проверенные токены: один и тот же токен приходит с каждым запросом клиента,
+# и повторно проверять подпись и разбирать JSON незачем
+_token_cache = TTLCache(ttl=settings.token_cache_ttl, maxsize=settings.token_cache_size)
+
+
+# Функции синхронные и считают bcrypt сотни миллисекунд:
+# из асинхронного кода их вызывают через asyncio.to_thread
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля"""
     return bcrypt.checkpw(
@@ -20,7 +38,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(password: str) -> str:
     """Хеширование пароля"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
@@ -29,23 +47,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     """Создание JWT токена"""
     to_encode = data.copy()
     
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
+    expire = datetime.utcnow() + (expires_delta or _JWT_EXPIRE)
     
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
+    encoded_jwt = jwt.encode(to_encode, _JWT_SECRET, algorithm=_JWT_ALGORITHM)
     
     return encoded_jwt
 
 
 def decode_access_token(token: str) -> Optional[dict]:
     """Декодирование JWT токена"""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = _token_cache.get(key)
+    if payload is not None:
+        # Токен мог истечь, пока лежал в кэше
+        if payload["exp"] > time.time():
+            return payload
+        _token_cache.invalidate(key)
+        return None
+    
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
-    except JWTError:
+        payload = jwt.decode(token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS, options=_JWT_DECODE_OPTIONS)
+    except jwt.PyJWTError:
         return None
+    
+    _token_cache.set(key, payload)
+    return payload
 
 
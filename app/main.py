@@ -1,16 +1,20 @@
 """
 WORK21 Backend - FastAPI Application
 """
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import text
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_engine, init_db
+from app.core.logging import setup_logging, shutdown_logging
 from app.api import api_router
-from app.admin import create_admin
+from app.api.admin import check_stats_view, refresh_stats_view
 
 
 @asynccontextmanager
@@ -19,10 +23,20 @@ async def lifespan(app: FastAPI):
     Lifecycle events: startup and shutdown
     """
     # Startup
+    log_listener = setup_logging()
     await init_db()
+    
+    stats_refresher = None
+    if await check_stats_view():
+        stats_refresher = asyncio.create_task(refresh_stats_view())
+    
     yield
     # Shutdown
-    pass
+    if stats_refresher:
+        stats_refresher.cancel()
+        with suppress(asyncio.CancelledError):
+            await stats_refresher
+    shutdown_logging(log_listener)
 
 
 # Создаём приложение
@@ -47,38 +61,39 @@ app = FastAPI(
     """,
     version=settings.app_version,
     lifespan=lifespan,
+    # orjson сериализует datetime и enum в C, быстрее стандартного json
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware - для работы с cookies через постоянные домены
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:8099",
-        "https://ift-1.brojs.ru",
-        "https://ift-2.brojs.ru",
-        "https://ift-3.brojs.ru",
-        "https://admin.work-21.com",
-        "https://work-21.com",
-    ],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,  # Включаем для cookies
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-# Session middleware (для админ-панели) - должен быть ПОСЛЕ CORS
-app.add_middleware(
-    SessionMiddleware,
-    secret_key="super-secret-session-key-work21-admin",
-    same_site="lax",
-    https_only=False,
-)
+# Session middleware (для админ-панели) - должен быть ПОСЛЕ CORS.
+# Без админки сессии не нужны, и cookie на каждом запросе не разбираются.
+# Подписывающий объект middleware создаёт один раз, при сборке приложения
+if settings.admin_enabled:
+    app.add_middleware(
+        SessionMiddleware,
+        secret_key=settings.session_secret,
+        same_site="lax",
+        https_only=False,
+    )
 
 # Подключаем роутеры
 app.include_router(api_router, prefix="/api/v1")
 
 # Админ-панель (доступна по /admin)
-admin = create_admin(app)
+# sqladmin, wtforms и jinja2 импортируются только если админка включена
+admin = None
+if settings.admin_enabled:
+    from app.admin import create_admin
+    admin = create_admin(app)
 
 
 @app.get("/", tags=["root"])
@@ -103,3 +118,23 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/db", tags=["health"])
+async def health_check_db():
+    """
+    Проверка соединения с БД (SELECT 1 через пул)
+    """
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+    except Exception:
+        return ORJSONResponse(status_code=503, content={"status": "unhealthy", "database": "unavailable"})
+    return {"status": "healthy", "database": "ok"}
+
+
+if settings.debug:
+    @app.get("/debug/pool", tags=["health"])
+    async def debug_pool():
+        """
+        Состояние пула соединений с БД (только в режиме отладки)
+        """
+        return {"pool": async_engine.pool.status()}
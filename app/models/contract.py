@@ -5,10 +5,10 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import String, Text, Float, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import String, Text, Float, ForeignKey, DateTime, Index, Enum as SQLEnum
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.core.database import Base
+from app.core.database import Base, utcnow
 
 
 class ContractStatus(str, Enum):
@@ -26,10 +26,14 @@ class Contract(Base):
     
     __tablename__ = "contracts"
     
+    __table_args__ = (
+        Index("ix_contracts_status_created_at", "status", "created_at", "id"),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Связи
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"), index=True)
     customer_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     student_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     
@@ -52,7 +56,7 @@ class Contract(Base):
     student_signed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     # Метаданные
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
     def __repr__(self) -> str:
@@ -5,10 +5,11 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, List
 
-from sqlalchemy import String, Text, Float, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import JSON, String, Text, Float, Integer, DateTime, ForeignKey, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.database import Base
+from app.core.database import Base, utcnow
 
 
 class ProjectStatus(str, Enum):
@@ -41,6 +42,12 @@ class Project(Base):
     
     __tablename__ = "projects"
     
+    __table_args__ = (
+        Index("ix_projects_status_created_at", "status", "created_at", "id"),
+        Index("ix_projects_assignee_created_at", "assignee_id", "created_at"),
+        Index("ix_projects_customer_created_at", "customer_id", "created_at"),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Основная информация
@@ -52,8 +59,11 @@ class Project(Base):
     budget: Mapped[float] = mapped_column(Float)
     deadline: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     
-    # Технический стек (JSON строка)
-    tech_stack: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Технический стек (список строк; в PostgreSQL — JSONB)
+    tech_stack: Mapped[Optional[List[str]]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"),
+        nullable=True
+    )
     
     # Статус
     status: Mapped[ProjectStatus] = mapped_column(
@@ -65,9 +75,12 @@ class Project(Base):
     customer_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     customer: Mapped["User"] = relationship("User", back_populates="projects", foreign_keys=[customer_id])
     
-    # Исполнитель проекта (студент)
+    # Исполнитель проекта (студент).
+    # Связи проекта lazy="raise": загружать их нужно явно в запросе (selectinload,
+    # contains_eager), а случайное обращение к незагруженной связи падает,
+    # вместо того чтобы тихо отправить по запросу на каждую строку (N+1)
     assignee_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
-    assignee: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assignee_id])
+    assignee: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assignee_id], lazy="raise")
     
     # Сгенерированное ТЗ от AI
     generated_spec: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
@@ -76,16 +89,17 @@ class Project(Base):
     llm_estimation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # Метаданные
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
-        default=datetime.utcnow,
+        server_default=utcnow(),
+        # Python-значение остаётся в объекте после UPDATE, без повторного SELECT
         onupdate=datetime.utcnow
     )
     
     # Relationships
-    tasks: Mapped[List["Task"]] = relationship("Task", back_populates="project")
-    applications: Mapped[List["Application"]] = relationship("Application", back_populates="project")
+    tasks: Mapped[List["Task"]] = relationship("Task", back_populates="project", lazy="raise")
+    applications: Mapped[List["Application"]] = relationship("Application", back_populates="project", lazy="raise")
     
     def __repr__(self) -> str:
         return f"<Project {self.title} ({self.status.value})>"
@@ -96,6 +110,10 @@ class Task(Base):
     
     __tablename__ = "tasks"
     
+    __table_args__ = (
+        Index("ix_tasks_project_order", "project_id", "order"),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Основная информация
@@ -120,11 +138,11 @@ class Task(Base):
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id"))
     project: Mapped["Project"] = relationship("Project", back_populates="tasks")
     
-    assignee_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True)
+    assignee_id: Mapped[Optional[int]] = mapped_column(ForeignKey("users.id"), nullable=True, index=True)
     assignee: Mapped[Optional["User"]] = relationship("User", foreign_keys=[assignee_id])
     
     # Метаданные
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     
     def __repr__(self) -> str:
         return f"<Task {self.title} ({self.status.value})>"
@@ -135,6 +153,15 @@ class Application(Base):
     
     __tablename__ = "applications"
     
+    __table_args__ = (
+        Index("ix_applications_status_created_at", "status", "created_at", "id"),
+        Index("ix_applications_student_project", "student_id", "project_id"),
+        Index("ix_applications_project_created_at", "project_id", "created_at"),
+        Index("ix_applications_student_created_at", "student_id", "created_at"),
+        # Одна заявка студента на проект
+        Index("ux_applications_project_student", "project_id", "student_id", unique=True),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Связи
@@ -157,7 +184,7 @@ class Application(Base):
     )
     
     # Метаданные
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     
     def __repr__(self) -> str:
         return f"<Application student={self.student_id} project={self.project_id}>"
@@ -4,10 +4,10 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, Integer, ForeignKey, DateTime
+from sqlalchemy import String, Text, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.core.database import Base
+from app.core.database import Base, utcnow
 
 
 class Rating(Base):
@@ -15,6 +15,12 @@ class Rating(Base):
     
     __tablename__ = "ratings"
     
+    __table_args__ = (
+        # Один отзыв участника на проект
+        Index("ux_ratings_project_reviewer", "project_id", "reviewer_id", unique=True),
+        Index("ix_ratings_reviewee_created_at", "reviewee_id", "created_at"),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     
     # Связи
@@ -36,7 +42,7 @@ class Rating(Base):
     deadline_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Соблюдение сроков
     
     # Метаданные
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     
     def __repr__(self) -> str:
         return f"<Rating project={self.project_id} score={self.score}>"
@@ -5,10 +5,11 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional, List
 
-from sqlalchemy import String, Text, Float, DateTime, Enum as SQLEnum
+from sqlalchemy import JSON, String, Text, Float, BigInteger, Integer, DateTime, Index, Enum as SQLEnum
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.core.database import Base
+from app.core.database import Base, utcnow
 
 
 class UserRole(str, Enum):
@@ -23,6 +24,12 @@ class User(Base):
     
     __tablename__ = "users"
     
+    __table_args__ = (
+        # Фильтры списков + сортировка по дате создания
+        Index("ix_users_role_created_at", "role", "created_at", "id"),
+        Index("ix_users_is_active_created_at", "is_active", "created_at", "id"),
+    )
+    
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     hashed_password: Mapped[str] = mapped_column(String(255))
@@ -34,20 +41,28 @@ class User(Base):
     
     # Дополнительные данные профиля
     bio: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
-    skills: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON строка
+    # Навыки (список строк; в PostgreSQL — JSONB)
+    skills: Mapped[Optional[List[str]]] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"),
+        nullable=True
+    )
     avatar_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     
     # Рейтинг (для студентов)
     rating_score: Mapped[float] = mapped_column(Float, default=0.0)
+    # Сумма и количество полученных оценок — средняя пересчитывается без AVG по ratings
+    rating_sum: Mapped[int] = mapped_column(BigInteger, default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     completed_projects: Mapped[int] = mapped_column(default=0)
     
     # Метаданные
     is_active: Mapped[bool] = mapped_column(default=True)
     is_verified: Mapped[bool] = mapped_column(default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=utcnow())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime, 
-        default=datetime.utcnow, 
+        DateTime,
+        server_default=utcnow(),
+        # Python-значение остаётся в объекте после UPDATE, без повторного SELECT
         onupdate=datetime.utcnow
     )
     
@@ -71,3 +86,10 @@ class User(Base):
         return f"<User {self.email} ({self.role.value})>"
 
 
+# Списки студентов и лидерборд: активные студенты по убыванию рейтинга.
+# Частичный индекс уже отсортирован, и LIMIT читает только первые записи
+Index(
+    "ix_users_student_rating",
+    User.rating_score.desc(),
+    postgresql_where=(User.role == UserRole.STUDENT) & (User.is_active == True),
+)
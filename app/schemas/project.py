@@ -1,11 +1,10 @@
 """
 Pydantic схемы для проектов, задач и заявок
 """
-import json
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field
 
 from app.models.project import ProjectStatus, TaskStatus, ApplicationStatus
 
@@ -98,8 +97,8 @@ class ProjectAssigneeInfo(BaseModel):
         from_attributes = True
 
 
-class ProjectResponse(ProjectBase):
-    """Схема ответа с данными проекта"""
+class ProjectListResponse(ProjectBase):
+    """Схема проекта в списках (без задач)"""
     id: int
     status: ProjectStatus
     customer_id: int
@@ -109,29 +108,14 @@ class ProjectResponse(ProjectBase):
     llm_estimation: Optional[str] = None
     created_at: datetime
     updated_at: datetime
-    tasks: List[TaskResponse] = []
     
-    @model_validator(mode='before')
-    @classmethod
-    def parse_tech_stack(cls, data):
-        """Преобразует tech_stack из JSON строки в список"""
-        if isinstance(data, dict):
-            tech_stack = data.get('tech_stack')
-            if isinstance(tech_stack, str) and tech_stack:
-                try:
-                    data['tech_stack'] = json.loads(tech_stack)
-                except (json.JSONDecodeError, TypeError):
-                    data['tech_stack'] = None
-        elif hasattr(data, '__dict__'):
-            # Если это объект модели SQLAlchemy или другой объект
-            tech_stack = getattr(data, 'tech_stack', None)
-            if isinstance(tech_stack, str) and tech_stack:
-                try:
-                    # Временно изменяем атрибут для сериализации
-                    object.__setattr__(data, 'tech_stack', json.loads(tech_stack))
-                except (json.JSONDecodeError, TypeError):
-                    object.__setattr__(data, 'tech_stack', None)
-        return data
+    class Config:
+        from_attributes = True
+
+
+class ProjectResponse(ProjectListResponse):
+    """Схема ответа с данными проекта"""
+    tasks: List[TaskResponse] = []
     
     class Config:
         from_attributes = True
@@ -46,7 +46,7 @@ class UserResponse(UserBase):
     """Схема ответа с данными пользователя"""
     id: int
     bio: Optional[str] = None
-    skills: Optional[str] = None
+    skills: Optional[List[str]] = None
     avatar_url: Optional[str] = None
     rating_score: float
     completed_projects: int
@@ -0,0 +1,28 @@
+"""
+Движок БД для разовых скриптов: без пула, соединение закрывается сразу после работы
+"""
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.core.database import Base
+import app.models  # noqa: F401  — регистрирует модели в Base.metadata
+
+
+# Скрипт выполняет пару запросов и завершается: пул приложения здесь не нужен
+engine = create_async_engine(settings.database_url, poolclass=NullPool)
+
+session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+async def create_tables():
+    """
+    Создать недостающие таблицы (create_all).
+    create_all проверяет каждую таблицу отдельным запросом; если users уже есть,
+    схема создана, и хватает одной проверки
+    """
+    async with engine.begin() as conn:
+        if await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("users")):
+            return
+        await conn.run_sync(Base.metadata.create_all)
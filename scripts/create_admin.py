@@ -5,8 +5,12 @@
   python scripts/create_admin.py                              # интерактивный режим
   python scripts/create_admin.py email@example.com password   # с аргументами
   ADMIN_PASSWORD=mypass python scripts/create_admin.py        # через env
+  python scripts/create_admin.py < answers.txt                # ответы построчно из stdin
+  python scripts/create_admin.py --init-db ...                # сначала создать таблицы
 """
+import argparse
 import asyncio
+import functools
 import sys
 import os
 import secrets
@@ -15,93 +19,199 @@ import string
 # Добавляем корень проекта в путь
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from sqlalchemy import select
-from app.core.database import async_session_maker, init_db
-from app.core.security import get_password_hash
-from app.models.user import User, UserRole
+# Модули приложения (настройки, модели, SQLAlchemy, bcrypt) импортируются в create_admin:
+# --help и ошибки в аргументах обходятся без их загрузки
+
+# Алфавит генерируемых паролей (70 символов).
+# Байты не меньше порога отбрасываем, иначе первые символы алфавита выпадали бы чаще
+_ALPHABET = (string.ascii_letters + string.digits + "!@#$%^&*").encode("ascii")
+_THRESHOLD = 256 - 256 % len(_ALPHABET)
+
+MIN_PASSWORD_LENGTH = 8
 
 
 def generate_secure_password(length: int = 16) -> str:
     """Генерация безопасного случайного пароля"""
-    alphabet = string.ascii_letters + string.digits + "!@#$%^&*"
-    return ''.join(secrets.choice(alphabet) for _ in range(length))
+    while True:
+        # Случайные байты берутся пачками, а не системным вызовом на каждый символ
+        password = bytearray()
+        while len(password) < length:
+            for b in secrets.token_bytes(length):
+                if b < _THRESHOLD:
+                    password.append(_ALPHABET[b % len(_ALPHABET)])
+        password = password[:length].decode("ascii")
+        # Изредка случайному паролю не хватает классов символов — генерируем заново
+        if is_strong_password(password):
+            return password
+
+
+def ask(prompt: str, default: str) -> str:
+    """Вопрос со значением по умолчанию: пустой ответ — default"""
+    return input(f"{prompt} [{default}]: ").strip() or default
+
+
+def is_valid_email(email: str) -> bool:
+    """Грубая проверка синтаксиса: непустая часть до @ и домен с точкой"""
+    local, at, domain = email.rpartition("@")
+    return bool(at and local) and "." in domain.strip(".")
+
+
+def is_strong_password(password: str) -> bool:
+    """Не короче MIN_PASSWORD_LENGTH и хотя бы 3 из 4 классов: заглавные, строчные, цифры, прочие"""
+    if len(password) < MIN_PASSWORD_LENGTH:
+        return False
+    
+    # Все четыре класса определяются за один проход по паролю
+    has_upper = has_lower = has_digit = has_special = False
+    for c in password:
+        if c.isupper():
+            has_upper = True
+        elif c.islower():
+            has_lower = True
+        elif c.isdigit():
+            has_digit = True
+        else:
+            has_special = True
+    return has_upper + has_lower + has_digit + has_special >= 3
 
 
-async def create_admin(email: str, password: str, first_name: str, last_name: str):
+async def create_admin(email: str, password: str, first_name: str, last_name: str, init_db: bool = False):
     """Создать администратора в базе данных"""
+    from scripts._admin_engine import engine, create_tables
+    from app.core.security import get_password_hash
     
-    # Инициализируем БД
-    await init_db()
+    try:
+        # bcrypt считается в потоке, параллельно с созданием таблиц.
+        # Таблицы обычно уже созданы приложением, проверять схему незачем
+        hashing = asyncio.to_thread(get_password_hash, password)
+        if init_db:
+            hashed_password, _ = await asyncio.gather(hashing, create_tables())
+        else:
+            hashed_password = await hashing
+        return await _create_admin(email, hashed_password, password, first_name, last_name)
+    finally:
+        await engine.dispose()
+
+
+@functools.cache
+def _upsert_statement():
+    """
+    Создание или повышение до админа одним INSERT ... ON CONFLICT DO UPDATE:
+    без отдельного SELECT и без гонки между проверкой и записью.
+    Уже существующего админа условие WHERE не трогает — тогда строки нет.
+    Пароль при повышении не меняется, поэтому совпадение хеша значит, что строка новая.
     
-    async with async_session_maker() as session:
-        # Проверяем, существует ли уже пользователь
-        result = await session.execute(
-            select(User).where(User.email == email)
-        )
-        existing_user = result.scalar_one_or_none()
-        
-        if existing_user:
-            if existing_user.role == UserRole.ADMIN:
-                print(f"⚠️  Администратор с email {email} уже существует")
-                return None
-            else:
-                # Повышаем до админа
-                existing_user.role = UserRole.ADMIN
-                existing_user.is_active = True
-                existing_user.is_verified = True
-                await session.commit()
-                print(f"✅ Пользователь {email} повышен до администратора")
-                return None
-        
-        # Создаём нового админа
-        admin = User(
-            email=email,
-            hashed_password=get_password_hash(password),
-            first_name=first_name,
-            last_name=last_name,
+    Собирается один раз, значения передаются параметрами: при повторных вызовах
+    в одном процессе (фикстуры, сиды) скомпилированный SQL берётся из кэша
+    """
+    from sqlalchemy import bindparam
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    
+    from app.models.user import User, UserRole
+    
+    hashed_password = bindparam("hashed_password")
+    return (
+        pg_insert(User)
+        .values(
+            email=bindparam("email"),
+            hashed_password=hashed_password,
+            first_name=bindparam("first_name"),
+            last_name=bindparam("last_name"),
             role=UserRole.ADMIN,
             is_active=True,
             is_verified=True,
             rating_score=0.0,
             completed_projects=0,
         )
-        
-        session.add(admin)
+        .on_conflict_do_update(
+            index_elements=[User.email],
+            set_={"role": UserRole.ADMIN, "is_active": True, "is_verified": True},
+            where=User.role != UserRole.ADMIN,
+        )
+        .returning(User.id, (User.hashed_password == hashed_password).label("inserted"))
+    )
+
+
+async def _create_admin(email: str, hashed_password: str, password: str, first_name: str, last_name: str):
+    from scripts._admin_engine import session_maker
+    
+    params = {
+        "email": email,
+        "hashed_password": hashed_password,
+        "first_name": first_name,
+        "last_name": last_name,
+    }
+    async with session_maker() as session:
+        row = (await session.execute(_upsert_statement(), params)).first()
         await session.commit()
-        await session.refresh(admin)
-        
-        print(f"✅ Администратор создан:")
-        print(f"   Email: {email}")
-        print(f"   Имя: {first_name} {last_name}")
-        print(f"   ID: {admin.id}")
-        
-        return password
+    
+    if row is None:
+        print(f"⚠️  Администратор с email {email} уже существует")
+        return None
+    
+    if not row.inserted:
+        print(f"✅ Пользователь {email} повышен до администратора")
+        return None
+    
+    print(
+        f"✅ Администратор создан:\n"
+        f"   Email: {email}\n"
+        f"   Имя: {first_name} {last_name}\n"
+        f"   ID: {row.id}"
+    )
+    
+    return password
 
 
 def main():
     """Главная функция"""
-    print("=" * 50)
-    print("🔐 Создание администратора WORK21")
-    print("=" * 50)
+    parser = argparse.ArgumentParser(description="Создание администратора WORK21")
+    parser.add_argument("email", nargs="?")
+    parser.add_argument("password", nargs="?")
+    parser.add_argument("first_name", nargs="?", default="Admin")
+    parser.add_argument("last_name", nargs="?", default="Work21")
+    parser.add_argument("--init-db", action="store_true", help="создать недостающие таблицы перед созданием администратора")
+    args = parser.parse_args()
+    
+    print("=" * 50, "🔐 Создание администратора WORK21", "=" * 50, sep="\n")
+    
+    # Переменные окружения читаются один раз и сразу удаляются:
+    # пароль не унаследует ни один дочерний процесс
+    env_email = os.environ.pop("ADMIN_EMAIL", None)
+    env_password = os.environ.pop("ADMIN_PASSWORD", None)
+    env_first_name = os.environ.pop("ADMIN_FIRST_NAME", "Admin")
+    env_last_name = os.environ.pop("ADMIN_LAST_NAME", "Work21")
     
-    # Приоритет: аргументы > env > интерактив
-    if len(sys.argv) >= 3:
+    # Приоритет: аргументы > env > stdin > интерактив
+    if args.email and args.password:
         # Режим с аргументами: python create_admin.py email password [first] [last]
-        email = sys.argv[1]
-        password = sys.argv[2]
-        first_name = sys.argv[3] if len(sys.argv) > 3 else "Admin"
-        last_name = sys.argv[4] if len(sys.argv) > 4 else "Work21"
+        email = args.email
+        password = args.password
+        first_name = args.first_name
+        last_name = args.last_name
         generated = False
-    elif os.environ.get("ADMIN_EMAIL") and os.environ.get("ADMIN_PASSWORD"):
+    elif env_email and env_password:
         # Режим через переменные окружения
-        email = os.environ["ADMIN_EMAIL"]
-        password = os.environ["ADMIN_PASSWORD"]
-        first_name = os.environ.get("ADMIN_FIRST_NAME", "Admin")
-        last_name = os.environ.get("ADMIN_LAST_NAME", "Work21")
+        email = env_email
+        password = env_password
+        first_name = env_first_name
+        last_name = env_last_name
         generated = False
+    elif not sys.stdin.isatty():
+        # Ввод из конвейера: те же четыре ответа построчно, прочитанные разом.
+        # Пустая строка — значение по умолчанию, как в интерактивном режиме
+        lines = [line.strip() for line in sys.stdin.read().splitlines()]
+        email, password, first_name, last_name = (lines + [""] * 4)[:4]
+        email = email or "admin@work21.ru"
+        first_name = first_name or "Admin"
+        last_name = last_name or "Work21"
+        generated = not password
+        if generated:
+            password = generate_secure_password()
+            print(f"🔑 Сгенерирован пароль: {password}")
     else:
         # Интерактивный режим
-        email = input("Email [admin@work21.ru]: ").strip() or "admin@work21.ru"
+        email = ask("Email", "admin@work21.ru")
         
         # Спрашиваем про пароль
         password_input = input("Пароль (Enter для генерации случайного): ").strip()
@@ -114,28 +224,47 @@ def main():
             generated = True
             print(f"🔑 Сгенерирован пароль: {password}")
         
-        first_name = input("Имя [Admin]: ").strip() or "Admin"
-        last_name = input("Фамилия [Work21]: ").strip() or "Work21"
+        first_name = ask("Имя", "Admin")
+        last_name = ask("Фамилия", "Work21")
+    
+    # Опечатку в email ловим до подключения к БД
+    if not is_valid_email(email):
+        print(f"❌ Некорректный email: {email}")
+        sys.exit(1)
     
     # Валидация пароля
-    if len(password) < 8:
-        print("❌ Пароль должен быть не менее 8 символов")
+    if not is_strong_password(password):
+        print(f"❌ Пароль должен быть не менее {MIN_PASSWORD_LENGTH} символов и содержать "
+              "хотя бы три вида символов из четырёх: заглавные и строчные буквы, цифры, спецсимволы")
         sys.exit(1)
     
-    result = asyncio.run(create_admin(email, password, first_name, last_name))
+    # uvloop ставится вместе с uvicorn[standard]; без него (например, на Windows) — обычный цикл
+    try:
+        from uvloop import run
+    except ImportError:
+        run = asyncio.run
+    
+    result = run(create_admin(email, password, first_name, last_name, init_db=args.init_db), debug=False)
     
-    print()
+    # Итог собирается целиком и выводится одной записью
+    lines = [""]
     if result:
-        print("=" * 50)
-        print("🎉 СОХРАНИТЕ ЭТИ ДАННЫЕ!")
-        print("=" * 50)
-        print(f"   URL:    https://admin.work-21.com")
-        print(f"   Email:  {email}")
-        print(f"   Пароль: {password}")
-        print("=" * 50)
+        lines += [
+            "=" * 50,
+            "🎉 СОХРАНИТЕ ЭТИ ДАННЫЕ!",
+            "=" * 50,
+            "   URL:    https://admin.work-21.com",
+            f"   Email:  {email}",
+            f"   Пароль: {password}",
+            "=" * 50,
+        ]
         if generated:
-            print("⚠️  Пароль был сгенерирован автоматически!")
-            print("   Сохраните его в безопасное место!")
+            lines += [
+                "⚠️  Пароль был сгенерирован автоматически!",
+                "   Сохраните его в безопасное место!",
+            ]
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":